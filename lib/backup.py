@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import List
+import pandas as pd
+import os
+
+# File written inside each ticker partition
+PART_FILE = 'part-0.parquet'
+
+def write_backup(path: str, ticker: str, indicators_df: pd.DataFrame, compression: str = 'zstd') -> str:
+    """
+    Write one ticker's indicators into a Parquet dataset partitioned by ticker.
+
+    Args:
+        path: Dataset directory
+        ticker: Ticker, written to the ticker=<ticker> partition (replacing a previous file)
+        indicators_df: Indicators indexed by Date, as returned by calculate_features
+        compression: Parquet compression codec (default: 'zstd')
+
+    Returns:
+        Path of the written file
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    directory = os.path.join(path, f"ticker={ticker}")
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, PART_FILE)
+    pq.write_table(pa.Table.from_pandas(indicators_df, preserve_index=True), file_path, compression=compression)
+    return file_path
+
+def read_backup(path: str, ticker: str = None, columns: List[str] = None) -> pd.DataFrame:
+    """
+    Read a backup dataset back, memory-mapping the Parquet files.
+
+    Args:
+        path: Dataset directory written by BackupWriter
+        ticker: Only read this ticker's partition (default: all tickers, with a 'ticker' column)
+        columns: Only read these indicator columns (default: all)
+
+    Returns:
+        Indicators indexed by Date, with the dtypes they were written with
+    """
+    import pyarrow.parquet as pq
+
+    if ticker is not None:
+        table = pq.read_table(os.path.join(path, f"ticker={ticker}", PART_FILE), columns=columns,
+                              memory_map=True, partitioning=None)
+    else:
+        table = pq.read_table(path, columns=columns, memory_map=True, partitioning='hive')
+    return table.to_pandas()
+
+class BackupWriter:
+    """
+    Writes indicator backups to a Parquet dataset in a background thread.
+
+    submit returns immediately while fewer than max_pending writes are queued, so
+    compression and disk writes stay off the calculation/upload path; past that it
+    waits for the oldest write, so at most max_pending DataFrames are held for the
+    backup. close waits for pending writes and re-raises the first error.
+    """
+
+    def __init__(self, path: str, compression: str = 'zstd', max_pending: int = 4):
+        """
+        Initialize the writer.
+
+        Args:
+            path (str): Dataset directory, one ticker=<ticker> partition per ticker
+            compression (str): Parquet compression codec (default: 'zstd')
+            max_pending (int): Writes queued or in progress before submit blocks (default: 4)
+        """
+        self.path: str = path
+        self.compression: str = compression
+        self.max_pending: int = max(max_pending, 1)
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='backup')
+        self._futures: deque = deque()
+
+    def submit(self, ticker: str, indicators_df: pd.DataFrame) -> None:
+        """Queues one ticker's indicators; the DataFrame must not be modified afterwards."""
+        # Release finished writes, then wait for the oldest ones while the queue is full
+        while self._futures and (self._futures[0].done() or len(self._futures) >= self.max_pending):
+            self._futures.popleft().result()
+        self._futures.append(self._executor.submit(write_backup, self.path, ticker, indicators_df, self.compression))
+
+    def close(self) -> None:
+        """Waits for all queued writes and raises the first error, if any."""
+        try:
+            while self._futures:
+                self._futures.popleft().result()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._futures.clear()
+
+    def __enter__(self) -> 'BackupWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep the original error; drop writes that have not started
+            self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,195 @@
+from sqlalchemy import insert, select, or_, true, Table, Column, MetaData, Float, Integer
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any
+import pandas as pd
+import numpy as np
+import io
+
+# Largest binary precision of a single precision (real) float column, e.g. Float(4)
+FLOAT32_MAX_PRECISION = 24
+
+def column_mapping(table: Table, output_columns: List[str]) -> Dict[str, str]:
+    """
+    Match indicator output columns to table columns by name.
+
+    An output column such as 'MACD_12_26_9_line' maps to the table column with the
+    same name in lower case ('macd_12_26_9_line'), so a new indicator only needs its
+    column added to the model.
+
+    Args:
+        table: Target table, e.g. EquityIndicators.__table__
+        output_columns: Indicator column names, e.g. from MarketIndicators.output_columns
+
+    Returns:
+        Mapping of table column name to indicator column name, for the output
+        columns the table has
+    """
+    return {
+        table.c[name.lower()].name: name
+        for name in output_columns
+        if name.lower() in table.c and not table.c[name.lower()].primary_key
+    }
+
+def column_dtypes(table: Table, columns: Dict[str, str], output_dtypes: Dict[str, Any]) -> Dict[str, np.dtype]:
+    """
+    Plan the dtype each indicator column is kept in, checked against the table's column types.
+
+    Float columns with a precision of at most 24 bits (Float(4), stored as real) are
+    kept as float32 since the database would round them anyway; other float columns
+    as float64. Integer columns keep the calculated integer dtype. Output columns the
+    table does not have keep their calculated dtype.
+
+    Args:
+        table: Target table, e.g. EquityIndicators.__table__
+        columns: Mapping of table column name to indicator column name, from column_mapping
+        output_dtypes: Calculated dtype per indicator column, e.g. from MarketIndicators.output_dtypes
+
+    Returns:
+        Mapping of indicator column name to dtype, in the order of output_dtypes
+
+    Raises:
+        ValueError: If an indicator column cannot be stored in its table column, such as
+        a float indicator in an integer column
+    """
+    table_columns = {feature: table.c[column] for column, feature in columns.items()}
+    dtypes = {}
+    for name, dtype in output_dtypes.items():
+        dtype = np.dtype(dtype)
+        if name not in table_columns:
+            dtypes[name] = dtype
+            continue
+
+        column = table_columns[name]
+        if isinstance(column.type, Float):
+            precision = column.type.precision
+            dtypes[name] = np.dtype(np.float32 if precision is not None and precision <= FLOAT32_MAX_PRECISION
+                                    else np.float64)
+        elif isinstance(column.type, Integer) and np.issubdtype(dtype, np.integer):
+            dtypes[name] = dtype
+        else:
+            raise ValueError(f"Indicator {name} ({dtype}) cannot be stored in {table.name}.{column.name} ({column.type})")
+    return dtypes
+
+def indicator_frame(indicators_df: pd.DataFrame, ticker: str, columns: Dict[str, str]) -> pd.DataFrame:
+    """
+    Build the rows of an indicator table from a calculated indicator DataFrame.
+
+    Args:
+        indicators_df: Indicators indexed by Date, as returned by calculate_features
+        ticker: Ticker the rows belong to
+        columns: Mapping of table column name to indicator DataFrame column name
+
+    Returns:
+        DataFrame with one column per table column; indicators missing from
+        indicators_df are left out so the table default (NULL) applies
+    """
+    data = {'ticker': ticker, 'report_date': indicators_df.index.values}
+    for column, feature in columns.items():
+        if feature in indicators_df.columns:
+            data[column] = indicators_df[feature].values
+    return pd.DataFrame(data)
+
+def copy_dataframe(session: Session, table: Table, df: pd.DataFrame) -> int:
+    """
+    Bulk load a DataFrame into a table inside the session's transaction.
+
+    On PostgreSQL the rows are streamed with COPY FROM STDIN in CSV format through
+    psycopg2's copy_expert, so no ORM objects or per-row statements are created.
+    Other dialects (e.g. an SQLite stand-in for tests) fall back to a single Core
+    executemany insert.
+
+    Args:
+        session: Open session; the caller commits
+        table: Target table, e.g. EquityIndicators.__table__
+        df: Rows to load, with columns named after the table columns
+
+    Returns:
+        Number of rows loaded
+    """
+    if df.empty:
+        return 0
+
+    connection = session.connection()
+    if connection.dialect.name != 'postgresql':
+        connection.execute(insert(table), df.to_dict('records'))
+        return len(df)
+
+    # NaN is written literally so float columns keep it, as the ORM path did
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep='NaN')
+    buffer.seek(0)
+
+    preparer = connection.dialect.identifier_preparer
+    column_list = ', '.join(preparer.quote(column) for column in df.columns)
+    statement = f"COPY {preparer.format_table(table)} ({column_list}) FROM STDIN WITH (FORMAT csv)"
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(statement, buffer)
+    finally:
+        cursor.close()
+    return len(df)
+
+def upsert_dataframe(session: Session, table: Table, df: pd.DataFrame) -> int:
+    """
+    Insert or update rows by primary key, writing only rows whose values changed.
+
+    The rows are first bulk loaded (copy_dataframe) into a temporary staging table
+    with the table's columns, then merged with one INSERT ... SELECT ... ON CONFLICT
+    DO UPDATE whose WHERE clause skips rows identical to the stored ones, so
+    unchanged history costs no writes and readers never see the ticker missing.
+    The staging table is created once per connection with ON COMMIT DELETE ROWS, so
+    commit or rollback empties it and a failed load surfaces its own error.
+
+    Args:
+        session: Open session; the caller commits
+        table: Target table with a primary key, e.g. EquityIndicators.__table__
+        df: Rows to merge, with columns named after the table columns
+
+    Returns:
+        Number of rows inserted or updated
+
+    Raises:
+        ValueError: If the database dialect has no INSERT ... ON CONFLICT
+    """
+    if df.empty:
+        return 0
+
+    connection = session.connection()
+    if connection.dialect.name == 'postgresql':
+        dialect_insert = postgresql.insert
+    elif connection.dialect.name == 'sqlite':
+        dialect_insert = sqlite.insert
+    else:
+        raise ValueError(f"Upsert needs INSERT ... ON CONFLICT, which the {connection.dialect.name} dialect "
+                         f"does not support; use PostgreSQL or SQLite")
+
+    # One staging table per connection, created on first use; commit or rollback empties it
+    staging = Table(
+        f"{table.name}_staging",
+        MetaData(),
+        *[Column(column.name, column.type) for column in table.columns],
+        prefixes=['TEMPORARY'],
+        postgresql_on_commit='DELETE ROWS'
+    )
+    staging.create(connection, checkfirst=True)
+    # Rows staged earlier in the same transaction (or on SQLite, which keeps them) are not merged again
+    connection.execute(staging.delete())
+    copy_dataframe(session, staging, df)
+
+    keys = [column.name for column in table.primary_key.columns]
+    values = [column for column in df.columns if column not in keys]
+    # WHERE true keeps SQLite from parsing ON CONFLICT as part of the SELECT
+    staged = select(*[staging.c[column] for column in df.columns]).where(true())
+    statement = dialect_insert(table).from_select(list(df.columns), staged)
+    if values:
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: statement.excluded[column] for column in values},
+            where=or_(*[table.c[column].is_distinct_from(statement.excluded[column]) for column in values])
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=keys)
+    result = connection.execute(statement)
+    return result.rowcount
@@ -0,0 +1,74 @@
+from lib.models.MarketData import MarketData
+from lib.db.market_data import MARKET_DATA_COLUMNS
+
+from sqlalchemy import select, and_, func
+from typing import List, Dict, Any, Tuple
+import pandas as pd
+import datetime
+
+def get_latest_indicators(db_session, model, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch the most recent stored indicator row for each ticker.
+
+    The table's columns are selected as plain Core rows, so no ORM objects are built.
+
+    Args:
+        db_session: Session context manager factory from create_db_session
+        model: Indicator model (EquityIndicators or IndexIndicators)
+        tickers: Tickers to look up
+
+    Returns:
+        Dict mapping ticker to its latest row as {column name: value}; tickers
+        without stored rows are left out
+    """
+    with db_session() as session:
+        latest = select(model.ticker, func.max(model.report_date).label('report_date'))\
+                    .where(model.ticker.in_(tickers))\
+                    .group_by(model.ticker)\
+                    .subquery()
+        query = select(*model.__table__.columns).join(latest, and_(model.ticker == latest.c.ticker,
+                                                                   model.report_date == latest.c.report_date))
+        rows = session.execute(query).mappings().all()
+
+        return {row['ticker']: dict(row) for row in rows}
+
+def get_market_data_window(db_session, ticker: str, last_date: datetime.date = None,
+                           lookback: int = 1, data_type: str = None) -> Tuple[pd.DataFrame, int]:
+    """
+    Fetch the trailing bars up to last_date and every bar after it for one ticker.
+
+    Rows are read as plain Core tuples of the MARKET_DATA_COLUMNS, as in fetch_market_data.
+
+    Args:
+        db_session: Session context manager factory from create_db_session
+        ticker: Ticker to fetch
+        last_date: Date of the last bar with stored indicators (None fetches the full history)
+        lookback: Number of bars up to and including last_date to fetch
+        data_type: Market data type filter ('equity' or 'index')
+
+    Returns:
+        DataFrame indexed by Date in the same layout as get_market_data, and the
+        number of its leading rows dated on or before last_date
+    """
+    conditions = [MarketData.ticker == ticker]
+    if data_type:
+        conditions.append(MarketData.type == data_type)
+
+    columns = list(MARKET_DATA_COLUMNS.values())
+    with db_session() as session:
+        history = []
+        newer_query = select(*columns).where(and_(*conditions))
+        if last_date is not None:
+            history_query = select(*columns)\
+                                .where(and_(*conditions, MarketData.report_date <= last_date))\
+                                .order_by(MarketData.report_date.desc())\
+                                .limit(lookback)
+            history = list(reversed(session.execute(history_query).all()))
+            newer_query = newer_query.where(MarketData.report_date > last_date)
+
+        newer = session.execute(newer_query.order_by(MarketData.report_date)).all()
+
+        df = pd.DataFrame.from_records(history + list(newer), columns=list(MARKET_DATA_COLUMNS.keys()))
+        df.set_index('Date', inplace=True)
+
+        return df, len(history)
@@ -0,0 +1,127 @@
+from lib.models.MarketData import MarketData
+
+from sqlalchemy import select, and_
+from typing import List, Dict, Iterator, Tuple, Union
+import pandas as pd
+import numpy as np
+import datetime
+
+# DataFrame column -> MarketData column, in the layout the indicator scripts expect
+MARKET_DATA_COLUMNS = {
+    'Date': MarketData.report_date,
+    'Open': MarketData.open,
+    'Close': MarketData.close,
+    'Low': MarketData.low,
+    'High': MarketData.high,
+    'Volume': MarketData.volume,
+    'Type': MarketData.type
+}
+
+def market_data_query(tickers: List[str] = None, start_date: datetime.date = None,
+                      end_date: datetime.date = None, data_type: Union[str, List[str]] = None):
+    """
+    Build the market data select for the given filters.
+
+    Only the ticker and the MARKET_DATA_COLUMNS are selected, ordered by ticker
+    then report_date, so each ticker's rows arrive contiguous and in date order.
+
+    Args:
+        tickers: Tickers to include (default: all)
+        start_date: First report date to include
+        end_date: Last report date to include
+        data_type: Market data type filter ('equity' or 'index'), or a list of types
+
+    Returns:
+        Select statement returning (ticker, *MARKET_DATA_COLUMNS) rows
+    """
+    conditions = []
+    if tickers:
+        conditions.append(MarketData.ticker.in_(tickers))
+    if start_date:
+        conditions.append(MarketData.report_date >= start_date)
+    if end_date:
+        conditions.append(MarketData.report_date <= end_date)
+    if isinstance(data_type, (list, tuple)):
+        conditions.append(MarketData.type.in_(data_type))
+    elif data_type:
+        conditions.append(MarketData.type == data_type)
+
+    query = select(MarketData.ticker, *MARKET_DATA_COLUMNS.values())
+    if conditions:
+        query = query.where(and_(*conditions))
+    return query.order_by(MarketData.ticker, MarketData.report_date)
+
+def _ticker_frame(pieces: List[pd.DataFrame]) -> pd.DataFrame:
+    """Joins the row pieces of one ticker into a DataFrame indexed by Date."""
+    return pd.concat(pieces).drop(columns='ticker').set_index('Date')
+
+def stream_market_data(db_session, tickers: List[str] = None, start_date: datetime.date = None,
+                       end_date: datetime.date = None, data_type: Union[str, List[str]] = None,
+                       chunk_size: int = 100_000) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Stream market data one complete ticker at a time.
+
+    Rows are read through a server-side cursor (stream_results with yield_per) as
+    plain Core tuples in chunks of chunk_size. Since the query is ordered by ticker,
+    a ticker is complete as soon as the next one starts, so it is yielded before the
+    rest of the table is read. Memory stays bounded by the largest ticker plus one chunk.
+
+    Args:
+        db_session: Session context manager factory from create_db_session
+        tickers: Tickers to include (default: all)
+        start_date: First report date to include
+        end_date: Last report date to include
+        data_type: Market data type filter ('equity' or 'index'), or a list of types
+        chunk_size: Rows fetched per round trip
+
+    Yields:
+        (ticker, DataFrame indexed by Date with the Open/Close/Low/High/Volume/Type
+        columns), in ticker order
+    """
+    names = ['ticker'] + list(MARKET_DATA_COLUMNS.keys())
+    query = market_data_query(tickers, start_date, end_date, data_type)
+
+    with db_session() as session:
+        result = session.execute(query, execution_options={'stream_results': True, 'yield_per': chunk_size})
+
+        ticker = None
+        pieces: List[pd.DataFrame] = []
+        for rows in result.partitions():
+            chunk = pd.DataFrame.from_records(rows, columns=names)
+            ticker_values = chunk['ticker'].to_numpy()
+            boundaries = np.flatnonzero(ticker_values[1:] != ticker_values[:-1]) + 1
+            starts = np.concatenate(([0], boundaries))
+            stops = np.concatenate((boundaries, [len(chunk)]))
+
+            for start, stop in zip(starts, stops):
+                if ticker is not None and ticker_values[start] != ticker:
+                    yield ticker, _ticker_frame(pieces)
+                    pieces = []
+                ticker = ticker_values[start]
+                pieces.append(chunk.iloc[start:stop])
+
+        if pieces:
+            yield ticker, _ticker_frame(pieces)
+
+def fetch_market_data(db_session, tickers: List[str] = None, start_date: datetime.date = None,
+                      end_date: datetime.date = None, data_type: Union[str, List[str]] = None,
+                      chunk_size: int = 100_000) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch market data as one DataFrame per ticker without creating ORM objects.
+
+    Collects stream_market_data, so rows are read as plain Core tuples in chunks
+    and arrive ordered by ticker and date; no Python-side sorting is needed.
+
+    Args:
+        db_session: Session context manager factory from create_db_session
+        tickers: Tickers to include (default: all)
+        start_date: First report date to include
+        end_date: Last report date to include
+        data_type: Market data type filter ('equity' or 'index'), or a list of types
+        chunk_size: Rows fetched per round trip
+
+    Returns:
+        Dict mapping ticker to a DataFrame indexed by Date with the
+        Open/Close/Low/High/Volume/Type columns, in ticker order
+    """
+    return dict(stream_market_data(db_session, tickers, start_date, end_date, data_type, chunk_size))
@@ -1,38 +1,72 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, Engine
 from sqlalchemy.orm import sessionmaker
-from contextlib import contextmanager
-from typing import ContextManager
+from contextlib import contextmanager, asynccontextmanager
+from typing import ContextManager, AsyncContextManager, Callable, Dict, Any
 from sqlalchemy.orm import Session
 
+# Engines created so far, keyed by URL and options, so repeated calls share one pool
+_engines: Dict[str, Any] = {}
+
+def _engine_key(database_url: str, options: Dict[str, Any]) -> str:
+    return f"{database_url}|{sorted(options.items(), key=lambda item: item[0])!r}"
+
 def create_db_session(
     user: str,
     password: str,
     host: str,
     port: str = "5432",
     database: str = "postgres",
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_pre_ping: bool = True,
+    statement_timeout: int = None,
     **kwargs
-) -> ContextManager[Session]:
+) -> Callable[[], ContextManager[Session]]:
     """
     Create and return a database session context manager.
-    
+
+    Engines are pooled and reused: calls with the same connection settings share
+    one engine, so sessions opened from several threads draw on one connection pool.
+    Inserts use psycopg2's execute_values batching (executemany_mode='values_plus_batch').
+
     Args:
         user: Database username
         password: Database password
         host: Database host
         port: Database port (default: "5432")
         database: Database name (default: "postgres")
+        pool_size: Connections kept open in the pool (default: 5)
+        max_overflow: Extra connections allowed beyond pool_size (default: 10)
+        pool_pre_ping: Test connections before use so dropped ones are replaced (default: True)
+        statement_timeout: Server-side statement timeout in milliseconds (default: none)
         **kwargs: Additional arguments for create_engine
-        
+
     Returns:
         Context manager that yields database session
     """
     # Create database URL
     database_url = f"postgresql://{user}:{password}@{host}:{port}/{database}"
-    
-    # Create SQLAlchemy engine and session
-    engine = create_engine(database_url, **kwargs)
+
+    options = {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_pre_ping': pool_pre_ping,
+        'executemany_mode': 'values_plus_batch',
+        **kwargs
+    }
+    if statement_timeout is not None:
+        options['connect_args'] = {
+            **options.get('connect_args', {}),
+            'options': f"-c statement_timeout={int(statement_timeout)}"
+        }
+
+    # Create SQLAlchemy engine once per settings and a session factory on it
+    key = _engine_key(database_url, options)
+    if key not in _engines:
+        _engines[key] = create_engine(database_url, **options)
+    engine: Engine = _engines[key]
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
+
     @contextmanager
     def get_db():
         db = SessionLocal()
@@ -40,5 +74,70 @@ def create_db_session(
             yield db
         finally:
             db.close()
-            
-    return get_db
\ No newline at end of file
+
+    return get_db
+
+def create_async_db_session(
+    user: str,
+    password: str,
+    host: str,
+    port: str = "5432",
+    database: str = "postgres",
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_pre_ping: bool = True,
+    statement_timeout: int = None,
+    **kwargs
+) -> Callable[[], AsyncContextManager]:
+    """
+    Create and return an async database session context manager using asyncpg.
+
+    Same settings and engine reuse as create_db_session; requires the asyncpg package.
+
+    Args:
+        user: Database username
+        password: Database password
+        host: Database host
+        port: Database port (default: "5432")
+        database: Database name (default: "postgres")
+        pool_size: Connections kept open in the pool (default: 5)
+        max_overflow: Extra connections allowed beyond pool_size (default: 10)
+        pool_pre_ping: Test connections before use so dropped ones are replaced (default: True)
+        statement_timeout: Server-side statement timeout in milliseconds (default: none)
+        **kwargs: Additional arguments for create_async_engine
+
+    Returns:
+        Async context manager that yields an AsyncSession
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    # Create database URL
+    database_url = f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{database}"
+
+    options = {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_pre_ping': pool_pre_ping,
+        **kwargs
+    }
+    if statement_timeout is not None:
+        connect_args = options.get('connect_args', {})
+        options['connect_args'] = {
+            **connect_args,
+            'server_settings': {**connect_args.get('server_settings', {}), 'statement_timeout': str(int(statement_timeout))}
+        }
+
+    key = _engine_key(database_url, options)
+    if key not in _engines:
+        _engines[key] = create_async_engine(database_url, **options)
+    SessionLocal = async_sessionmaker(_engines[key], autoflush=False, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    return get_db
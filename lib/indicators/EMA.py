@@ -1,36 +1,122 @@
+from lib.indicators.kernels import JIT_ENABLED, ema_recursion
+
 import numpy as np
+from typing import Sequence, Tuple
+
+# Largest weight ratio allowed inside one chunk of the closed-form EMA. Keeping the
+# rescaled prefix sums within this range keeps the result within float rounding of
+# the step-by-step recursion.
+_MAX_CHUNK_GROWTH: float = 1e8
+
+def ema_chunk_plan(timeFrames: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, int, np.ndarray]:
+    """
+    Work out the chunked closed-form EMA schedule shared by a group of periods.
+
+    Args:
+        timeFrames (Sequence[int]): EMA periods calculated together
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, int, np.ndarray]: Smoothing factor per period, mask of
+        periods with memory (decay > 0), chunk size, and decay^(t+1) for t < chunk size as a
+        (chunk_size, n_recursive) array.
+    """
+    smoothing: np.ndarray = 2.0 / (np.asarray(list(timeFrames), dtype=float) + 1)
+    decay: np.ndarray = 1 - smoothing
+    recursive: np.ndarray = decay > 0
+    if not recursive.any():
+        return smoothing, recursive, 1, np.ones((1, 0), dtype=float)
+
+    chunk_size: int = max(1, int(np.log(_MAX_CHUNK_GROWTH) / -np.log(decay[recursive].min())))
+    steps: np.ndarray = np.arange(1, chunk_size + 1, dtype=float).reshape(-1, 1)
+    return smoothing, recursive, chunk_size, decay[recursive] ** steps
+
+def calculate_ema_batch(indicator: np.ndarray, timeFrames: Sequence[int],
+                        initial_values: Sequence[float] = None) -> np.ndarray:
+    """
+    Calculate the EMA for several periods over the same input in one pass.
+
+    The recursion ema[i] = x[i] * k + ema[i-1] * (1 - k), seeded with ema[0] = x[0],
+    is unrolled per chunk of rows: with d = 1 - k,
+    ema[s + t] = d^(t+1) * (ema[s-1] + k * sum_{j<=t} x[s+j] / d^(j+1)),
+    so each chunk is one cumulative sum over all periods at once. Chunks are sized so
+    d^-chunk stays below _MAX_CHUNK_GROWTH for the fastest-decaying period. When the
+    compiled kernels are enabled (see kernels.JIT_ENABLED) the recursion is run step
+    by step by ema_recursion instead.
+
+    Args:
+        indicator (np.ndarray): Array of price values, shape (n_rows,) or (n_rows, n_series)
+        timeFrames (Sequence[int]): EMA periods, one output column each
+        initial_values (Sequence[float]): EMA value at index 0 per period, to continue a
+            previously computed series (default: the first input value)
+
+    Returns:
+        np.ndarray: Array of shape indicator.shape + (len(timeFrames),).
+    """
+    values: np.ndarray = np.asarray(indicator, dtype=float)[..., None]
+    smoothing, recursive, chunk_size, powers = ema_chunk_plan(timeFrames)
+    ema_values: np.ndarray = np.empty(values.shape[:-1] + (len(smoothing),), dtype=float)
+    if len(values) == 0 or len(smoothing) == 0:
+        return ema_values
+
+    # A period of 1 has no memory (decay 0), the EMA is the input itself
+    ema_values[..., ~recursive] = values
+    if initial_values is not None:
+        initial_values = np.asarray(list(initial_values), dtype=float)
+        ema_values[:1] = np.where(recursive, initial_values, ema_values[:1])
+    if not recursive.any():
+        return ema_values
+
+    smoothing = smoothing[recursive]
+    powers = powers.reshape((chunk_size,) + (1,) * (values.ndim - 2) + (len(smoothing),))
+
+    result: np.ndarray = np.empty(values.shape[:-1] + (len(smoothing),), dtype=float)
+    result[0] = values[0] if initial_values is None else initial_values[recursive]
+    if JIT_ENABLED:
+        series: np.ndarray = np.ascontiguousarray(values.reshape(len(values), -1))
+        first_row: np.ndarray = np.ascontiguousarray(result[0].reshape(series.shape[1], len(smoothing)))
+        ema_values[..., recursive] = ema_recursion(series, smoothing, first_row).reshape(result.shape)
+        return ema_values
+
+    for start in range(1, len(values), chunk_size):
+        stop: int = min(start + chunk_size, len(values))
+        chunk_powers: np.ndarray = powers[:stop - start]
+        scaled_sums: np.ndarray = np.cumsum(values[start:stop] / chunk_powers, axis=0)
+        result[start:stop] = chunk_powers * (result[start - 1] + smoothing * scaled_sums)
+
+    ema_values[..., recursive] = result
+    return ema_values
 
 class EMAIndicator:
     """Calculates the Exponential Moving Average (EMA) over a specified time frame."""
 
-    def __init__(self, indicator: np.ndarray, timeFrame: int):
+    def __init__(self, indicator: np.ndarray, timeFrame: int, ema_values: np.ndarray = None):
         """
         Initialize EMA calculator.
 
         Args:
             indicator (np.ndarray): Array of price values
             timeFrame (int): Period for EMA calculation
+            ema_values (np.ndarray): Precomputed EMA values, e.g. from calculate_ema_batch (optional)
         """
         self.indicator: np.ndarray = indicator
         self.timeFrame: int = timeFrame
         self.smoothing: float = 2.0 / (timeFrame + 1)
-        
+
         # Pre-calculate all EMA values to avoid recursion
-        self.ema_values: np.ndarray = self._calculate_all_emas()
+        self.ema_values: np.ndarray = ema_values if ema_values is not None else self._calculate_all_emas()
 
     def _calculate_all_emas(self) -> np.ndarray:
         """Calculate all EMA values at once using numpy."""
-        ema_values = np.zeros_like(self.indicator, dtype=float)
-        
-        # First value is just the first price
-        ema_values[0] = self.indicator[0]
-        
-        # Calculate subsequent values
-        for i in range(1, len(self.indicator)):
-            ema_values[i] = (self.indicator[i] * self.smoothing + 
-                           ema_values[i-1] * (1 - self.smoothing))
-            
-        return ema_values
+        return calculate_ema_batch(self.indicator, [self.timeFrame])[..., 0]
+
+    def compute_series(self) -> np.ndarray:
+        """
+        Get the EMA values for every index.
+
+        Returns:
+            np.ndarray: The EMA series, same length as the input.
+        """
+        return self.ema_values
 
     def calculate(self, index: int) -> float:
         """
@@ -44,5 +130,5 @@ class EMAIndicator:
         """
         if index < 0:
             return 0.0
-        
-        return float(self.ema_values[index])
\ No newline at end of file
+
+        return float(self.ema_values[index])
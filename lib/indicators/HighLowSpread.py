@@ -1,9 +1,18 @@
 import numpy as np
+from lib.indicators.SMA import rolling_mean, rolling_mean_from_prefix_sums
+from typing import Tuple
+
+def daily_spreads(high_prices: np.ndarray, low_prices: np.ndarray) -> np.ndarray:
+    """Per-bar high-low spread as a percentage of the low price."""
+    high_prices = np.asarray(high_prices, dtype=float)
+    low_prices = np.asarray(low_prices, dtype=float)
+    return ((high_prices - low_prices) / low_prices) * 100
 
 class HighLowSpreadIndicator:
     """Calculates the High-Low Spread (price range) over a specified time frame."""
 
-    def __init__(self, high_prices: np.ndarray, low_prices: np.ndarray, timeFrame: int = 14):
+    def __init__(self, high_prices: np.ndarray, low_prices: np.ndarray, timeFrame: int = 14,
+                 spread_prefix_sums: Tuple[np.ndarray, np.ndarray] = None):
         """
         Initialize High-Low Spread calculator.
 
@@ -11,11 +20,25 @@ class HighLowSpreadIndicator:
             high_prices (np.ndarray): Array of high prices
             low_prices (np.ndarray): Array of low prices
             timeFrame (int): Period for spread calculation (default: 14 days)
+            spread_prefix_sums (Tuple[np.ndarray, np.ndarray]): Precomputed rolling_mean_prefix_sums
+                of the daily spreads, shared between periods (default: computed here)
         """
         self.high_prices: np.ndarray = high_prices
         self.low_prices: np.ndarray = low_prices
         self.timeFrame: int = timeFrame
+        self.spread_prefix_sums: Tuple[np.ndarray, np.ndarray] = spread_prefix_sums
         
+    def compute_series(self) -> np.ndarray:
+        """
+        Calculate the average High-Low Spread for every index.
+
+        Returns:
+            np.ndarray: The spread series, same length as the input.
+        """
+        if self.spread_prefix_sums is not None:
+            return rolling_mean_from_prefix_sums(self.spread_prefix_sums, self.timeFrame)
+        return rolling_mean(daily_spreads(self.high_prices, self.low_prices), self.timeFrame)
+
     def calculate(self, index: int) -> float:
         """
         Calculate the average High-Low Spread for a given index.
@@ -41,4 +64,4 @@ class HighLowSpreadIndicator:
         daily_spreads: np.ndarray = ((high_window - low_window) / low_window) * 100
         
         # Return average spread over the period
-        return float(np.mean(daily_spreads))
\ No newline at end of file
+        return float(np.mean(daily_spreads))
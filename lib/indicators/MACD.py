@@ -1,13 +1,15 @@
 import numpy as np
-from lib.indicators.EMA import EMAIndicator
+from lib.indicators.EMA import EMAIndicator, calculate_ema_batch
 
 class MACDIndicator:
     """Calculates the MACD (Moving Average Convergence Divergence)."""
 
-    def __init__(self, indicator: np.ndarray, 
-                 fast_period: int = 12, 
+    def __init__(self, indicator: np.ndarray,
+                 fast_period: int = 12,
                  slow_period: int = 26,
-                 signal_period: int = 9):
+                 signal_period: int = 9,
+                 fast_ema_values: np.ndarray = None,
+                 slow_ema_values: np.ndarray = None):
         """
         Initialize MACD calculator.
 
@@ -16,15 +18,32 @@ class MACDIndicator:
             fast_period (int): Short-term EMA period (default: 12)
             slow_period (int): Long-term EMA period (default: 26)
             signal_period (int): Signal line EMA period (default: 9)
+            fast_ema_values (np.ndarray): Precomputed fast EMA values (optional)
+            slow_ema_values (np.ndarray): Precomputed slow EMA values (optional)
         """
         self.indicator: np.ndarray = indicator
-        self.fast_ema = EMAIndicator(indicator, fast_period)
-        self.slow_ema = EMAIndicator(indicator, slow_period)
-        
+
+        # Compute both EMAs in a single pass unless they were supplied
+        if fast_ema_values is None or slow_ema_values is None:
+            ema_matrix: np.ndarray = calculate_ema_batch(indicator, [fast_period, slow_period])
+            fast_ema_values, slow_ema_values = ema_matrix[..., 0], ema_matrix[..., 1]
+        self.fast_ema = EMAIndicator(indicator, fast_period, ema_values=fast_ema_values)
+        self.slow_ema = EMAIndicator(indicator, slow_period, ema_values=slow_ema_values)
+
         # Calculate MACD line values to use for signal line
-        self.macd_values = np.array([self.calculate_macd(i) for i in range(len(indicator))])
+        self.macd_values: np.ndarray = self.fast_ema.ema_values - self.slow_ema.ema_values
         self.signal_ema = EMAIndicator(self.macd_values, signal_period)
 
+    def compute_series(self) -> np.ndarray:
+        """
+        Get the MACD line, signal line and histogram for every index.
+
+        Returns:
+            np.ndarray: Array of shape indicator.shape + (3,) with columns line, signal, histogram.
+        """
+        signal_values: np.ndarray = self.signal_ema.compute_series()
+        return np.stack((self.macd_values, signal_values, self.macd_values - signal_values), axis=-1)
+
     def calculate_macd(self, index: int) -> float:
         """Calculate MACD line (Fast EMA - Slow EMA)."""
         fast_value = self.fast_ema.calculate(index)
@@ -39,4 +58,4 @@ class MACDIndicator:
         """Calculate MACD histogram (MACD line - Signal line)."""
         macd_value = self.calculate_macd(index)
         signal_value = self.calculate_signal(index)
-        return float(macd_value - signal_value)
\ No newline at end of file
+        return float(macd_value - signal_value)
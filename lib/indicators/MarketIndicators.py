@@ -1,20 +1,183 @@
-from lib.indicators.RSI import RSIIndicator
-from lib.indicators.SMA import SMAIndicator
-from lib.indicators.EMA import EMAIndicator
+from lib.indicators.RSI import calculate_rsi_batch, gains_losses
+from lib.indicators.SMA import SMAIndicator, rolling_mean_prefix_sums
+from lib.indicators.EMA import EMAIndicator, calculate_ema_batch
 from lib.indicators.MACD import MACDIndicator
-from lib.indicators.RealizedVolatility import RealizedVolatilityIndicator
-from lib.indicators.HighLowSpread import HighLowSpreadIndicator
-from lib.indicators.OBV import OBVIndicator
+from lib.indicators.RealizedVolatility import RealizedVolatilityIndicator, log_return_prefix_sums
+from lib.indicators.HighLowSpread import HighLowSpreadIndicator, daily_spreads
+from lib.indicators.OBV import OBVIndicator, integral_volume
 from lib.indicators.ReturnChange import PercentageChangeIndicator
 
-from typing import List, Dict, Callable, Any
+from typing import List, Dict, Callable, Any, Tuple
 import pandas as pd
 import numpy as np
 
+# Input columns the indicators read from the market data
+PRICE_COLUMNS: Tuple[str, ...] = ('Close', 'High', 'Low', 'Volume')
+
+# Intermediate arrays each feature reads, computed once per calculation and shared
+FEATURE_INTERMEDIATES: Dict[str, Tuple[str, ...]] = {
+    'RSI': ('gains_losses',),
+    'SMA': ('close_prefix_sums',),
+    'EMA': ('shared_emas',),
+    'MACD': ('shared_emas',),
+    'RV': ('log_return_prefix_sums',),
+    'HLS': ('spread_prefix_sums',),
+    'OBV': ('close_diff',),
+    'PCT': ()
+}
+
+# Price values per panel in calculate_panel_features; larger universes are split into
+# blocks of tickers so each panel array stays cache-sized
+PANEL_BLOCK_ELEMENTS: int = 2 ** 16
+
+# Intermediates built from other intermediates
+INTERMEDIATE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    'gains_losses': ('close_diff',)
+}
+
+class OutputBuffer:
+    """
+    Preallocated indicator matrix that feature columns are written into as they are calculated.
+
+    Float columns share one matrix of the plan's most common float dtype, sized from the
+    output layout up front and laid out as (n_series, n_columns, n_rows): every column of
+    every series is contiguous, each feature's columns are copied into their slice with
+    one assignment per column, and the calculator's own arrays can be freed right away.
+    Other columns (the int64 OBV, or float columns planned in another dtype) are kept
+    separately. frame wraps one series' block in a DataFrame without copying it.
+    """
+
+    def __init__(self, layout: Dict[str, Any], n_rows: int,
+                 dtypes: Dict[str, Any] = None, n_series: int = 1):
+        """
+        Initialize the buffer.
+
+        Args:
+            layout (Dict[str, Any]): Calculated dtype per output column, in output order (from output_dtypes)
+            n_rows (int): Number of rows kept, longer arrays are cut off
+            dtypes (Dict[str, Any]): Dtype per output column for compact mode (default: the calculated dtypes)
+            n_series (int): Number of series; above 1 the arrays written are (n_rows, n_series) panels (default: 1)
+        """
+        self.n_rows: int = n_rows
+        self.n_series: int = n_series
+        self.names: List[str] = list(layout.keys())
+
+        # Float columns take the planned float dtype, any other column is kept as calculated
+        self.dtypes: Dict[str, np.dtype] = {}
+        for name, calculated in layout.items():
+            dtype: np.dtype = np.dtype((dtypes or {}).get(name, calculated))
+            floating: bool = np.issubdtype(calculated, np.floating) and np.issubdtype(dtype, np.floating)
+            self.dtypes[name] = dtype if floating else np.dtype(calculated)
+
+        float_dtypes: List[np.dtype] = [dtype for dtype in self.dtypes.values() if np.issubdtype(dtype, np.floating)]
+        matrix_dtype: np.dtype = max(set(float_dtypes), key=float_dtypes.count, default=np.dtype(float))
+        self.slots: Dict[str, int] = {}
+        for name, dtype in self.dtypes.items():
+            if dtype == matrix_dtype:
+                self.slots[name] = len(self.slots)
+        self.matrix: np.ndarray = np.empty((n_series, len(self.slots), n_rows), dtype=matrix_dtype)
+        self.others: Dict[str, np.ndarray] = {}
+
+    def write(self, columns: Dict[str, np.ndarray]) -> None:
+        """Stores calculated columns, copying float columns into their matrix slice."""
+        for name, values in columns.items():
+            # Transposed, a panel column lines up with the (n_series, n_rows) slice
+            values = values[:self.n_rows].T
+            if name in self.slots and np.issubdtype(values.dtype, np.floating):
+                self.matrix[:, self.slots[name]] = values
+            else:
+                # e.g. OBV, or an OBV that came out float because of missing volumes
+                dtype: np.dtype = self.dtypes.get(name, values.dtype)
+                if not (np.issubdtype(values.dtype, np.floating) and np.issubdtype(dtype, np.floating)):
+                    dtype = values.dtype
+                self.others[name] = np.array(values, dtype=dtype).reshape(self.n_series, -1)
+
+    def frame(self, index: pd.Index, inputs: pd.DataFrame = None, position: int = 0) -> pd.DataFrame:
+        """
+        Wraps one series of the buffer in a DataFrame.
+
+        Args:
+            index (pd.Index): Index of the series' rows, at most n_rows long
+            inputs (pd.DataFrame): Input columns to insert in front of the indicators; pandas
+                copies them unless copy-on-write is enabled (default: indicators only)
+            position (int): Series to take (default: 0)
+
+        Returns:
+            pd.DataFrame: The indicator columns in output order, after the input columns if given.
+        """
+        n_rows: int = len(index)
+        matrix_columns: List[str] = [name for name in self.names if name in self.slots]
+        df: pd.DataFrame = pd.DataFrame(self.matrix[position, :, :n_rows].T, index=index,
+                                        columns=matrix_columns, copy=False)
+        for loc, name in enumerate(self.names):
+            if name not in self.slots:
+                df.insert(loc, name, self.others[name][position, :n_rows])
+
+        if inputs is not None:
+            input_columns: List[str] = [column for column in inputs.columns if column not in self.dtypes]
+            for loc, column in enumerate(input_columns):
+                df.insert(loc, column, inputs[column])
+        return df
+
+class CalculationContext:
+    """
+    State of one calculation: its inputs and the intermediates built for it so far.
+
+    Each _calculate_columns call creates its own context and passes it to the feature
+    calculators, so concurrent calculations on one MarketIndicators never share state.
+    """
+
+    def __init__(self, prices: Dict[str, np.ndarray], features: List[str],
+                 params: Dict[str, Dict[str, Any]], builders: Dict[str, Callable]):
+        """
+        Initialize the context.
+
+        Args:
+            prices (Dict[str, np.ndarray]): Price arrays keyed like the input columns
+            features (List[str]): Features being calculated
+            params (Dict[str, Dict[str, Any]]): Parameters per feature
+            builders (Dict[str, Callable]): Builder per intermediate name
+        """
+        self.prices: Dict[str, np.ndarray] = prices
+        self.features: List[str] = features
+        self.params: Dict[str, Dict[str, Any]] = params
+        self.builders: Dict[str, Callable] = builders
+        self.intermediates: Dict[str, Any] = {}
+
+    def intermediate(self, name: str) -> Any:
+        """Returns an intermediate of this calculation, building it on first use."""
+        if name not in self.intermediates:
+            self.intermediates[name] = self.builders[name](self.prices, self.features, self.params, self)
+        return self.intermediates[name]
+
+    def release(self, name: str) -> None:
+        """Frees an intermediate once no remaining feature needs it."""
+        self.intermediates.pop(name, None)
+
 class MarketIndicators:
     """Handles calculation of technical indicators for stock market data."""
     
-    def __init__(self):
+    def __init__(self, debug: bool = False):
+        """
+        Initialize the indicator calculator.
+
+        Args:
+            debug (bool): Print intermediate results while calculating (default: False)
+        """
+        self.debug: bool = debug
+
+        # Output layout per feature/parameter spec, see output_dtypes
+        self._layouts: Dict[str, Dict[str, np.dtype]] = {}
+
+        # Builders of the intermediates shared between features, see CalculationContext
+        self.intermediate_builders: Dict[str, Callable] = {
+            'close_diff': self._build_close_diff,
+            'gains_losses': self._build_gains_losses,
+            'close_prefix_sums': self._build_close_prefix_sums,
+            'shared_emas': self._build_shared_emas,
+            'log_return_prefix_sums': self._build_log_return_prefix_sums,
+            'spread_prefix_sums': self._build_spread_prefix_sums
+        }
         self.feature_calculators: Dict[str, Callable] = {
             'RSI': self._calculate_rsi_features,
             'SMA': self._calculate_sma_features,
@@ -41,142 +204,386 @@ class MarketIndicators:
             'PCT': {'periods': [5, 20, 50, 200]}
         }
     
-    def _calculate_rsi_features(self, df: pd.DataFrame, close_prices: np.ndarray, 
-                              params: Dict[str, Any]) -> pd.DataFrame:
+    def _calculate_rsi_features(self, prices: Dict[str, np.ndarray],
+                              params: Dict[str, Any], context: CalculationContext) -> Dict[str, np.ndarray]:
         """Calculates RSI indicators for specified periods with padding."""
+        periods: List[int] = list(params['periods'])
 
-        def _apply_rsi_padding(df: pd.DataFrame, period: int) -> None:
-            """Applies padding to the beginning and end of the DataFrame."""
-            df.iloc[0, df.columns.get_loc(f'RSI_{period}')] = 0.0
-            df.iloc[1, df.columns.get_loc(f'RSI_{period}')] = 100.0
-            
-            for j in range(2, len(df)):
-                if j < period and f'RSI_{j}' in df.columns:
-                    df.iloc[j, df.columns.get_loc(f'RSI_{period}')] = df.iloc[j, df.columns.get_loc(f'RSI_{j}')]
-                    
-        for period in params['periods']:
-            rsi_indicator: RSIIndicator = RSIIndicator(close_prices, period)
-            df[f'RSI_{period}'] = [rsi_indicator.calculate(j) for j in range(len(df))]
-            print(df.head())
-            _apply_rsi_padding(df, period)
-        return df
+        # All periods share one gain/loss pass; warm-up padding is applied by the batch kernel
+        rsi_matrix: np.ndarray = calculate_rsi_batch(prices['Close'], periods, padding=True,
+                                                     gain_loss=context.intermediate('gains_losses'))
+        if self.debug:
+            print(f"[DEBUG] RSI features {periods}:\n{rsi_matrix[:5]}")
+
+        return {f'RSI_{period}': rsi_matrix[..., k] for k, period in enumerate(periods)}
     
-    def _calculate_sma_features(self, df: pd.DataFrame, close_prices: np.ndarray, 
-                              params: Dict[str, Any]) -> pd.DataFrame:
+    def _calculate_sma_features(self, prices: Dict[str, np.ndarray],
+                              params: Dict[str, Any], context: CalculationContext) -> Dict[str, np.ndarray]:
         """Calculates SMA indicators for specified periods."""
+        columns: Dict[str, np.ndarray] = {}
         for period in params['periods']:
-            sma_indicator: SMAIndicator = SMAIndicator(close_prices, period)
-            df[f'SMA_{period}'] = [sma_indicator.calculate(j) for j in range(len(df))]
-        return df
+            sma_indicator: SMAIndicator = SMAIndicator(prices['Close'], period,
+                                                       prefix_sums=context.intermediate('close_prefix_sums'))
+            columns[f'SMA_{period}'] = sma_indicator.compute_series()
+        return columns
 
-    def _calculate_ema_features(self, df: pd.DataFrame, close_prices: np.ndarray, 
-                              params: Dict[str, Any]) -> pd.DataFrame:
+    def _calculate_ema_features(self, prices: Dict[str, np.ndarray],
+                              params: Dict[str, Any], context: CalculationContext) -> Dict[str, np.ndarray]:
         """Calculates EMA indicators for specified periods."""
+        columns: Dict[str, np.ndarray] = {}
         for period in params['periods']:
-            ema_indicator: EMAIndicator = EMAIndicator(close_prices, period)
-            df[f'EMA_{period}'] = [ema_indicator.calculate(j) for j in range(len(df))]
-        return df
+            ema_indicator: EMAIndicator = EMAIndicator(prices['Close'], period,
+                                                       ema_values=context.intermediate('shared_emas')[period])
+            columns[f'EMA_{period}'] = ema_indicator.compute_series()
+        return columns
     
-    def _calculate_macd_features(self, df: pd.DataFrame, close_prices: np.ndarray, 
-                               params: Dict[str, Any]) -> pd.DataFrame:
+    def _calculate_macd_features(self, prices: Dict[str, np.ndarray],
+                               params: Dict[str, Any], context: CalculationContext) -> Dict[str, np.ndarray]:
         """
         Calculates MACD indicators (MACD line, Signal line, and Histogram).
         """
         macd_indicator = MACDIndicator(
-            close_prices,
+            prices['Close'],
             fast_period=params.get('fast_period', 12),
             slow_period=params.get('slow_period', 26),
-            signal_period=params.get('signal_period', 9)
+            signal_period=params.get('signal_period', 9),
+            fast_ema_values=context.intermediate('shared_emas')[params.get('fast_period', 12)],
+            slow_ema_values=context.intermediate('shared_emas')[params.get('slow_period', 26)]
         )
 
         # Calculate MACD components
-        df[f'MACD_{params.get('fast_period', 12)}_{params.get('slow_period', 26)}_{params.get('signal_period', 9)}_line'] = [macd_indicator.calculate_macd(j) for j in range(len(df))]
-        df[f'MACD_{params.get('fast_period', 12)}_{params.get('slow_period', 26)}_{params.get('signal_period', 9)}_signal'] = [macd_indicator.calculate_signal(j) for j in range(len(df))]
-        df[f'MACD_{params.get('fast_period', 12)}_{params.get('slow_period', 26)}_{params.get('signal_period', 9)}_histogram'] = [macd_indicator.calculate_histogram(j) for j in range(len(df))]
-        
-        return df
+        prefix: str = f"MACD_{params.get('fast_period', 12)}_{params.get('slow_period', 26)}_{params.get('signal_period', 9)}"
+        macd_matrix: np.ndarray = macd_indicator.compute_series()
+        return {
+            f'{prefix}_line': macd_matrix[..., 0],
+            f'{prefix}_signal': macd_matrix[..., 1],
+            f'{prefix}_histogram': macd_matrix[..., 2]
+        }
     
-    def _calculate_rv_features(self, df: pd.DataFrame, close_prices: np.ndarray, 
-                             params: Dict[str, Any]) -> pd.DataFrame:
+    def _calculate_rv_features(self, prices: Dict[str, np.ndarray],
+                             params: Dict[str, Any], context: CalculationContext) -> Dict[str, np.ndarray]:
         """
         Calculates Realized Volatility for specified periods.
         """
         trading_days = params.get('trading_days', 252)
         
+        columns: Dict[str, np.ndarray] = {}
         for period in params['periods']:
             rv_indicator = RealizedVolatilityIndicator(
-                close_prices,
+                prices['Close'],
                 timeFrame=period,
-                trading_days=trading_days
+                trading_days=trading_days,
+                return_prefix_sums=context.intermediate('log_return_prefix_sums')
             )
             
             # Calculate and store volatility values
-            df[f'RV_{period}'] = [rv_indicator.calculate(j) for j in range(len(df))]
+            columns[f'RV_{period}'] = rv_indicator.compute_series()
             
-        return df
+        return columns
 
-    def _calculate_hls_features(self, df: pd.DataFrame, 
-                              params: Dict[str, Any]) -> pd.DataFrame:
+    def _calculate_hls_features(self, prices: Dict[str, np.ndarray],
+                              params: Dict[str, Any], context: CalculationContext) -> Dict[str, np.ndarray]:
         """
         Calculates High-Low Spread for specified periods.
         """
-        high_prices: np.ndarray = df['High'].values
-        low_prices: np.ndarray = df['Low'].values
-        
+        columns: Dict[str, np.ndarray] = {}
         for period in params['periods']:
             hls_indicator = HighLowSpreadIndicator(
-                high_prices=high_prices,
-                low_prices=low_prices,
-                timeFrame=period
+                high_prices=prices['High'],
+                low_prices=prices['Low'],
+                timeFrame=period,
+                spread_prefix_sums=context.intermediate('spread_prefix_sums')
             )
             
             # Calculate and store spread values
-            df[f'HLS_{period}'] = [hls_indicator.calculate(j) for j in range(len(df))]
+            columns[f'HLS_{period}'] = hls_indicator.compute_series()
             
-        return df
+        return columns
 
-    def _calculate_obv_features(self, df: pd.DataFrame, close_prices: np.ndarray, 
-                                params: Dict[str, Any]) -> pd.DataFrame:
+    def _calculate_obv_features(self, prices: Dict[str, np.ndarray],
+                                params: Dict[str, Any], context: CalculationContext) -> Dict[str, np.ndarray]:
             """
             Calculates On-Balance Volume (OBV) and its moving average if specified.
             """
-            volume: np.ndarray = df['Volume'].values
-            
-            # Calculate OBV
-            obv_indicator = OBVIndicator(close_prices, volume)
-            df['OBV'] = [obv_indicator.calculate(j) for j in range(len(df))]
-            
-            return df
+            obv_indicator = OBVIndicator(prices['Close'], prices['Volume'],
+                                         price_changes=context.intermediate('close_diff'))
+            return {'OBV': obv_indicator.compute_series()}
 
-    def _calculate_pct_features(self, df: pd.DataFrame, close_prices: np.ndarray, 
-                                params: Dict[str, Any]) -> pd.DataFrame:
+    def _calculate_pct_features(self, prices: Dict[str, np.ndarray],
+                                params: Dict[str, Any], context: CalculationContext) -> Dict[str, np.ndarray]:
             """Calculates percentage change indicators for specified periods."""
+            columns: Dict[str, np.ndarray] = {}
             for period in params['periods']:
-                pct_indicator = PercentageChangeIndicator(close_prices, period)
-                df[f'PCT_{period}'] = [pct_indicator.calculate(j) for j in range(len(df))]
-            return df
+                pct_indicator = PercentageChangeIndicator(prices['Close'], period)
+                columns[f'PCT_{period}'] = pct_indicator.compute_series()
+            return columns
 
-    def calculate_features(self, df: pd.DataFrame, 
-                         features: List[str] = None, 
-                         custom_params: Dict[str, Dict[str, Any]] = None) -> pd.DataFrame:
-        """Calculates specified technical indicators for the given data."""
-        
-        # Create a copy to avoid modifying original data
-        df = df.copy()
-        
-        # Extract close prices
-        close_prices: np.ndarray = df['Close'].values
-        
+    def shared_ema_spans(self, features: List[str], params: Dict[str, Dict[str, Any]]) -> List[int]:
+        """Lists the EMA spans needed by the EMA and MACD features, calculated together."""
+        spans: List[int] = []
+        if 'EMA' in features:
+            spans.extend(params['EMA']['periods'])
+        if 'MACD' in features:
+            spans.append(params['MACD'].get('fast_period', 12))
+            spans.append(params['MACD'].get('slow_period', 26))
+        return list(dict.fromkeys(spans))
+
+    def _build_close_diff(self, prices: Dict[str, np.ndarray], features: List[str],
+                          params: Dict[str, Dict[str, Any]], context: CalculationContext) -> np.ndarray:
+        """Bar-to-bar change of the close, shared by RSI and OBV."""
+        return np.diff(np.asarray(prices['Close'], dtype=float), axis=0)
+
+    def _build_gains_losses(self, prices: Dict[str, np.ndarray], features: List[str],
+                            params: Dict[str, Dict[str, Any]], context: CalculationContext) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-bar gains and losses shared by every RSI period."""
+        return gains_losses(context.intermediate('close_diff'))
+
+    def _build_close_prefix_sums(self, prices: Dict[str, np.ndarray], features: List[str],
+                                 params: Dict[str, Dict[str, Any]], context: CalculationContext) -> Tuple[np.ndarray, np.ndarray]:
+        """Prefix sums of the close shared by every SMA period."""
+        return rolling_mean_prefix_sums(prices['Close'])
+
+    def _build_shared_emas(self, prices: Dict[str, np.ndarray], features: List[str],
+                           params: Dict[str, Dict[str, Any]], context: CalculationContext) -> Dict[int, np.ndarray]:
+        """Calculates every EMA span needed by the EMA and MACD features in one pass."""
+        spans: List[int] = self.shared_ema_spans(features, params)
+        if not spans:
+            return {}
+
+        ema_matrix: np.ndarray = calculate_ema_batch(prices['Close'], spans)
+        return {span: ema_matrix[..., k] for k, span in enumerate(spans)}
+
+    def _build_log_return_prefix_sums(self, prices: Dict[str, np.ndarray], features: List[str],
+                                      params: Dict[str, Dict[str, Any]], context: CalculationContext) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Log return prefix sums shared by every RV period."""
+        return log_return_prefix_sums(prices['Close'])
+
+    def _build_spread_prefix_sums(self, prices: Dict[str, np.ndarray], features: List[str],
+                                  params: Dict[str, Dict[str, Any]], context: CalculationContext) -> Tuple[np.ndarray, np.ndarray]:
+        """Prefix sums of the daily high-low spread shared by every HLS period."""
+        return rolling_mean_prefix_sums(daily_spreads(prices['High'], prices['Low']))
+
+    def intermediate_plan(self, features: List[str]) -> Dict[str, Tuple[str, ...]]:
+        """
+        Resolves the intermediates each feature depends on, directly or through other intermediates.
+
+        Args:
+            features (List[str]): Features to calculate
+
+        Returns:
+            Dict[str, Tuple[str, ...]]: Intermediate names per feature, dependencies first.
+        """
+        def resolve(name: str, resolved: List[str]) -> None:
+            for dependency in INTERMEDIATE_DEPENDENCIES.get(name, ()):
+                resolve(dependency, resolved)
+            if name not in resolved:
+                resolved.append(name)
+
+        plan: Dict[str, Tuple[str, ...]] = {}
+        for feature in features:
+            resolved: List[str] = []
+            for name in FEATURE_INTERMEDIATES.get(feature, ()):
+                resolve(name, resolved)
+            plan[feature] = tuple(resolved)
+        return plan
+
+    def resolve_params(self, features: List[str],
+                        custom_params: Dict[str, Dict[str, Any]]) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+        """Fills in the default feature list and merges custom parameters over the defaults."""
         features = features or list(self.feature_calculators.keys())
         params = {**self.default_params}
         if custom_params:
             params.update(custom_params)
-        
+        return features, params
+
+    def _calculate_columns(self, prices: Dict[str, np.ndarray], features: List[str],
+                           params: Dict[str, Dict[str, Any]],
+                           sink: Callable[[Dict[str, np.ndarray]], None] = None) -> Dict[str, np.ndarray]:
+        """
+        Calculates the indicator columns for the given price arrays.
+
+        Price arrays are keyed like the input columns ('Close', 'High', 'Low', 'Volume') and
+        are either one series of shape (n_rows,) or a panel of shape (n_rows, n_tickers).
+        Intermediates (close diff, gains and losses, return prefix sums, EMA spans) are built
+        once on first use and released as soon as no remaining feature needs them.
+        With a sink, each feature's columns are handed to it as soon as they are calculated
+        (e.g. OutputBuffer.write) instead of being collected and returned.
+        """
+        features = [feature for feature in features if feature in self.feature_calculators]
+        plan: Dict[str, Tuple[str, ...]] = self.intermediate_plan(features)
+        remaining_uses: Dict[str, int] = {}
         for feature in features:
-            if feature in self.feature_calculators:
-                if feature == 'HLS':
-                    df = self.feature_calculators[feature](df, params[feature])
-                else:
-                    df = self.feature_calculators[feature](df, close_prices, params[feature])
+            for name in plan[feature]:
+                remaining_uses[name] = remaining_uses.get(name, 0) + 1
+
+        context: CalculationContext = CalculationContext(prices, features, params, self.intermediate_builders)
+        columns: Dict[str, np.ndarray] = {}
+        for feature in features:
+            feature_columns: Dict[str, np.ndarray] = self.feature_calculators[feature](prices, params[feature], context)
+            if sink is not None:
+                sink(feature_columns)
+            else:
+                columns.update(feature_columns)
+            del feature_columns
+            for name in plan[feature]:
+                remaining_uses[name] -= 1
+                if remaining_uses[name] == 0:
+                    context.release(name)
+        return columns
+
+    def output_dtypes(self, features: List[str] = None,
+                      custom_params: Dict[str, Dict[str, Any]] = None) -> Dict[str, np.dtype]:
+        """
+        Lists the indicator columns calculate_features adds, in order, with their calculated dtypes.
+
+        The names and dtypes come from calculating the features on a single bar, so they
+        always match the calculators' own output; the layout is remembered per spec.
+
+        Args:
+            features (List[str]): Features to calculate (default: all)
+            custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+
+        Returns:
+            Dict[str, np.dtype]: Dtype per output column name.
+        """
+        features, params = self.resolve_params(features, custom_params)
+        key: str = repr((features, sorted(params.items())))
+        if key not in self._layouts:
+            prices: Dict[str, np.ndarray] = {column: np.ones(1) for column in PRICE_COLUMNS}
+            self._layouts[key] = {name: values.dtype
+                                  for name, values in self._calculate_columns(prices, features, params).items()}
+        return self._layouts[key]
+
+    def output_columns(self, features: List[str] = None,
+                       custom_params: Dict[str, Dict[str, Any]] = None) -> List[str]:
+        """
+        Lists the indicator column names calculate_features adds, in order.
+
+        Args:
+            features (List[str]): Features to calculate (default: all)
+            custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+
+        Returns:
+            List[str]: Output column names.
+        """
+        return list(self.output_dtypes(features, custom_params).keys())
+
+    def calculate_arrays(self, prices: Dict[str, np.ndarray],
+                         features: List[str] = None,
+                         custom_params: Dict[str, Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Calculates specified technical indicators straight from price arrays.
+
+        Args:
+            prices (Dict[str, np.ndarray]): Price arrays keyed like the input columns
+                ('Close', 'High', 'Low', 'Volume'), shape (n_rows,) or (n_rows, n_tickers)
+            features (List[str]): Features to calculate (default: all)
+            custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+
+        Returns:
+            Dict[str, np.ndarray]: Indicator arrays keyed by output column name.
+        """
+        features, params = self.resolve_params(features, custom_params)
+        return self._calculate_columns(prices, features, params)
+
+    def calculate_features(self, df: pd.DataFrame, 
+                         features: List[str] = None, 
+                         custom_params: Dict[str, Dict[str, Any]] = None,
+                         dtypes: Dict[str, Any] = None) -> pd.DataFrame:
+        """
+        Calculates specified technical indicators for the given data.
+
+        The indicator columns are written into one preallocated OutputBuffer sized from
+        the output layout, and the result is a DataFrame wrapped around it, with df's
+        columns inserted in front. With a dtype plan (compact mode) only the indicator
+        columns are returned, and float indicators can be kept as float32.
+
+        Args:
+            df (pd.DataFrame): Market data with Close/High/Low/Volume columns
+            features (List[str]): Features to calculate (default: all)
+            custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+            dtypes (Dict[str, Any]): Dtype per output column for compact mode, e.g. from column_dtypes
+
+        Returns:
+            pd.DataFrame: df's columns followed by the indicator columns, or the indicator columns only in compact mode.
+        """
+        features, params = self.resolve_params(features, custom_params)
+        
+        # Extract price arrays
+        prices: Dict[str, np.ndarray] = {
+            column: df[column].values for column in PRICE_COLUMNS if column in df.columns
+        }
         
-        return df
\ No newline at end of file
+        buffer: OutputBuffer = OutputBuffer(self.output_dtypes(features, params), len(df), dtypes)
+        self._calculate_columns(prices, features, params, sink=buffer.write)
+        return buffer.frame(df.index, None if dtypes is not None else df)
+
+    def _calculate_panel_block(self, data: Dict[str, pd.DataFrame], features: List[str],
+                               params: Dict[str, Dict[str, Any]],
+                               dtypes: Dict[str, Any] = None) -> Dict[str, pd.DataFrame]:
+        """Calculates one block of calculate_panel_features as a single panel."""
+        tickers: List[str] = list(data.keys())
+        n_rows: int = max(len(data[ticker]) for ticker in tickers)
+
+        prices: Dict[str, np.ndarray] = {}
+        for column in PRICE_COLUMNS:
+            if not all(column in data[ticker].columns for ticker in tickers):
+                continue
+            series: List[np.ndarray] = [data[ticker][column].values for ticker in tickers]
+            integral: bool = all(np.issubdtype(values.dtype, np.integer) for values in series)
+            panel: np.ndarray = (np.zeros((n_rows, len(tickers)), dtype=np.int64) if integral
+                                 else np.full((n_rows, len(tickers)), 0.0 if column == 'Volume' else np.nan))
+            for j, values in enumerate(series):
+                panel[:len(values), j] = values
+            prices[column] = panel
+
+        # One buffer with a block per ticker; each feature's panel columns are copied in and freed
+        buffer: OutputBuffer = OutputBuffer(self.output_dtypes(features, params), n_rows, dtypes,
+                                            n_series=len(tickers))
+        self._calculate_columns(prices, features, params, sink=buffer.write)
+
+        results: Dict[str, pd.DataFrame] = {}
+        for j, ticker in enumerate(tickers):
+            df: pd.DataFrame = data[ticker]
+            results[ticker] = buffer.frame(df.index, None if dtypes is not None else df, position=j)
+            # A fractional volume elsewhere in the panel leaves OBV float for every ticker
+            if ('OBV' in buffer.others and np.issubdtype(buffer.others['OBV'].dtype, np.floating)
+                    and integral_volume(df['Volume'].values)):
+                results[ticker]['OBV'] = results[ticker]['OBV'].astype(np.int64)
+        return results
+
+    def calculate_panel_features(self, data: Dict[str, pd.DataFrame],
+                                 features: List[str] = None,
+                                 custom_params: Dict[str, Dict[str, Any]] = None,
+                                 dtypes: Dict[str, Any] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Calculates specified technical indicators for many tickers in one pass.
+
+        The tickers are stacked into (n_rows, n_tickers) panels, in blocks of about
+        PANEL_BLOCK_ELEMENTS price values, and every indicator is computed column-wise
+        over a block at once. Histories are aligned on their first bar and shorter ones
+        are padded after their last bar (NaN prices, zero volume). Indicators only look
+        back, so padding never affects a real bar and each ticker's result matches
+        calculate_features on its own DataFrame.
+
+        Args:
+            data (Dict[str, pd.DataFrame]): Market data per ticker, as passed to calculate_features
+            features (List[str]): Features to calculate (default: all)
+            custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+            dtypes (Dict[str, Any]): Dtype per output column for compact mode, as in calculate_features
+
+        Returns:
+            Dict[str, pd.DataFrame]: Indicator DataFrame per ticker, in the order of data. The
+            indicator columns are views into one matrix shared by the tickers of a block.
+        """
+        features, params = self.resolve_params(features, custom_params)
+        tickers: List[str] = list(data.keys())
+        results: Dict[str, pd.DataFrame] = {}
+
+        # Tickers are calculated in blocks whose panels stay cache-sized
+        n_rows: int = max([len(data[ticker]) for ticker in tickers], default=1)
+        block_size: int = max(1, PANEL_BLOCK_ELEMENTS // max(n_rows, 1))
+        for start in range(0, len(tickers), block_size):
+            block: Dict[str, pd.DataFrame] = {ticker: data[ticker] for ticker in tickers[start:start + block_size]}
+            results.update(self._calculate_panel_block(block, features, params, dtypes))
+        return results
\ No newline at end of file
@@ -1,36 +1,70 @@
+from lib.indicators.kernels import JIT_ENABLED, obv_recursion
+
 import numpy as np
 
+def integral_volume(volume: np.ndarray) -> bool:
+    """Whether every volume is a whole number, so OBV can be kept as int64."""
+    volume = np.asarray(volume)
+    return bool(np.issubdtype(volume.dtype, np.integer)
+                or (np.isfinite(volume).all() and (volume == np.trunc(volume)).all()))
+
 class OBVIndicator:
     """Calculates the On-Balance Volume (OBV)."""
 
-    def __init__(self, close_prices: np.ndarray, volume: np.ndarray):
+    def __init__(self, close_prices: np.ndarray, volume: np.ndarray, price_changes: np.ndarray = None):
         """
         Initialize OBV calculator.
 
         Args:
             close_prices (np.ndarray): Array of closing prices
             volume (np.ndarray): Array of volume values
+            price_changes (np.ndarray): Precomputed np.diff of the closing prices (default: computed here)
         """
         self.close_prices: np.ndarray = close_prices
         self.volume: np.ndarray = volume
+        self.price_changes: np.ndarray = price_changes
         self._calculate_all_obv()
         
     def _calculate_all_obv(self) -> None:
-        """Pre-calculate all OBV values efficiently."""
-        self.obv_values = np.zeros(len(self.volume))
-        
-        # Initialize first value
-        self.obv_values[0] = self.volume[0]
-        
-        # Calculate subsequent values
-        for i in range(1, len(self.close_prices)):
-            if self.close_prices[i] > self.close_prices[i-1]:
-                self.obv_values[i] = self.obv_values[i-1] + self.volume[i]
-            elif self.close_prices[i] < self.close_prices[i-1]:
-                self.obv_values[i] = self.obv_values[i-1] - self.volume[i]
-            else:
-                self.obv_values[i] = self.obv_values[i-1]
-        
+        """
+        Pre-calculate all OBV values as a cumulative sum of signed volume.
+
+        Values are int64 to match the BigInteger obv column; volumes that cannot be
+        represented as integers (missing or fractional values) keep a float result.
+        """
+        volume: np.ndarray = np.asarray(self.volume)
+        if integral_volume(volume):
+            volume = volume.astype(np.int64)
+
+        self.obv_values = np.empty(volume.shape, dtype=volume.dtype)
+        if len(volume) == 0:
+            return
+
+        # Volume is added on up days, subtracted on down days, unchanged days add nothing
+        price_changes: np.ndarray = self.price_changes
+        if price_changes is None:
+            price_changes = np.diff(np.asarray(self.close_prices, dtype=float), axis=0)
+        if JIT_ENABLED:
+            n_series: int = int(np.prod(volume.shape[1:]))
+            obv_recursion(np.ascontiguousarray(price_changes.reshape(len(volume) - 1, n_series)),
+                          np.ascontiguousarray(volume.reshape(len(volume), n_series)),
+                          self.obv_values.reshape(len(volume), n_series))
+            return
+        signed_volume: np.ndarray = np.where(price_changes > 0, volume[1:],
+                                             np.where(price_changes < 0, -volume[1:], 0))
+        self.obv_values[0] = volume[0]
+        np.cumsum(signed_volume, axis=0, out=self.obv_values[1:])
+        self.obv_values[1:] += volume[0]
+
+    def compute_series(self) -> np.ndarray:
+        """
+        Get the OBV values for every index.
+
+        Returns:
+            np.ndarray: The OBV series (int64), same length as the input.
+        """
+        return self.obv_values
+
     def calculate(self, index: int) -> float:
         """
         Get the OBV value for a given index.
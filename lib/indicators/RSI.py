@@ -1,119 +1,197 @@
 import numpy as np
+from typing import Iterator, List, Sequence, Tuple
+
+def gains_losses(price_changes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split bar-to-bar price changes into per-bar gains and losses.
+
+    Index 0 has no previous price, so its gain and loss are 0.
+
+    Args:
+        price_changes (np.ndarray): Bar-to-bar price changes, np.diff(prices, axis=0)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Gains and losses, each with len(price_changes) + 1 rows.
+    """
+    gains: np.ndarray = np.zeros((len(price_changes) + 1,) + price_changes.shape[1:], dtype=float)
+    losses: np.ndarray = np.zeros_like(gains)
+    np.copyto(gains[1:], price_changes, where=price_changes > 0)
+    np.negative(price_changes, out=losses[1:], where=price_changes < 0)
+    return gains, losses
+
+def _gains_losses(indicator: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Gains and losses of a price array (see gains_losses)."""
+    return gains_losses(np.diff(np.asarray(indicator, dtype=float), axis=0))
+
+def trailing_window_sums(values: np.ndarray, timeFrames: Sequence[int]) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Sum the trailing timeFrame rows for several window lengths, oldest row first.
+
+    Each window is added up left to right like a plain loop over it, so the sums are
+    exactly those of the per-index RSI definition; windows cut off at the start are
+    padded with leading zeros, which leave the sums unchanged. All windows start at
+    the same row for a given length difference, so shorter sums are extended into
+    longer ones and the cost is one pass per row of the longest window.
+
+    Args:
+        values (np.ndarray): Values to sum along the first axis
+        timeFrames (Sequence[int]): Window lengths
+
+    Yields:
+        Tuple[int, np.ndarray]: Each distinct window length in increasing order with its
+        sums, shaped like values. The sums are a view that the next step overwrites.
+    """
+    n_rows: int = len(values)
+    longest: int = max(timeFrames)
+    padded: np.ndarray = np.zeros((n_rows + longest - 1,) + values.shape[1:], dtype=float)
+    padded[longest - 1:] = values
+
+    # accumulator[b] holds the sum of padded[b:b + length], built up one row at a time
+    accumulator: np.ndarray = np.zeros_like(padded)
+    wanted: set = set(timeFrames)
+    for length in range(1, longest + 1):
+        accumulator[:len(padded) - length + 1] += padded[length - 1:]
+        if length in wanted:
+            start: int = longest - length
+            yield length, accumulator[start:start + n_rows]
+
+def _rsi_from_window_sums(gain_sums: np.ndarray, loss_sums: np.ndarray, timeFrame: int,
+                          out: np.ndarray = None) -> np.ndarray:
+    """
+    Calculate RSI values from trailing gain/loss sums.
+
+    Args:
+        gain_sums (np.ndarray): Sums of gains over the trailing timeFrame bars
+        loss_sums (np.ndarray): Sums of losses over the trailing timeFrame bars
+        timeFrame (int): Period for RSI calculation
+        out (np.ndarray): Array to write the RSI values into (default: a new array)
+
+    Returns:
+        np.ndarray: RSI values, 0 at index 0 and 100 wherever the window has no losses.
+    """
+    index: np.ndarray = np.arange(len(gain_sums))
+    realTimeFrame: np.ndarray = np.minimum(timeFrame, index + 1).reshape((-1,) + (1,) * (gain_sums.ndim - 1))
+
+    averageGain: np.ndarray = gain_sums / realTimeFrame
+    averageLoss: np.ndarray = loss_sums / realTimeFrame
+
+    # 100 - 100 / (1 + RS), computed in place in averageGain
+    has_loss: np.ndarray = averageLoss != 0
+    relativeStrength: np.ndarray = np.divide(averageGain, averageLoss, out=averageGain, where=has_loss)
+    np.add(1, relativeStrength, out=relativeStrength)
+    np.divide(100, relativeStrength, out=relativeStrength)
+    rsi_values: np.ndarray = np.subtract(100, relativeStrength, out=out)
+    np.copyto(rsi_values, 100.0, where=~has_loss)
+    rsi_values[:1] = 0.0
+    return rsi_values
+
+def calculate_rsi_batch(indicator: np.ndarray, periods: Sequence[int], padding: bool = True,
+                        gain_loss: Tuple[np.ndarray, np.ndarray] = None) -> np.ndarray:
+    """
+    Calculate RSI for several periods at once, sharing the gains, losses and window sums.
+
+    With padding enabled, the warm-up rule used for the RSI_<period> columns is applied:
+    row 0 is 0, row 1 is 100, and for rows j < period the value is taken from the
+    RSI_j column when j is one of the periods listed before it.
+
+    Args:
+        indicator (np.ndarray): Array of price values, shape (n_rows,) or (n_rows, n_series)
+        periods (Sequence[int]): RSI periods, one output column each, in order
+        padding (bool): Apply the warm-up padding rule (default: True)
+        gain_loss (Tuple[np.ndarray, np.ndarray]): Precomputed gains_losses of the prices
+
+    Returns:
+        np.ndarray: Array of shape indicator.shape + (len(periods),).
+    """
+    periods: List[int] = list(periods)
+    if len(indicator) == 0 or not periods:
+        return np.zeros(np.shape(indicator) + (len(periods),), dtype=float)
+
+    gains, losses = gain_loss if gain_loss is not None else _gains_losses(indicator)
+
+    # Stored period-major, so each period's column is one contiguous block; each period
+    # is finished as soon as its window sums are reached
+    rsi_values: np.ndarray = np.empty((len(periods),) + gains.shape, dtype=float)
+    for (period, gain_sums), (_, loss_sums) in zip(trailing_window_sums(gains, periods),
+                                                   trailing_window_sums(losses, periods)):
+        for k in [k for k, p in enumerate(periods) if p == period]:
+            _rsi_from_window_sums(gain_sums, loss_sums, period, out=rsi_values[k])
+    rsi_matrix: np.ndarray = np.moveaxis(rsi_values, 0, -1)
+    if not padding:
+        return rsi_matrix
+
+    apply_rsi_padding(rsi_matrix, periods)
+    return rsi_matrix
+
+def apply_rsi_padding(rsi_matrix: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """
+    Apply the RSI warm-up padding rule in place over a block of RSI columns.
+
+    Row 0 is set to 0 and row 1 to 100. For each column, rows j < period are copied
+    from the column of period j when j >= 2 and that period appears earlier in periods.
+    Those source cells are never themselves padded, so all copies happen in one step.
+
+    Args:
+        rsi_matrix (np.ndarray): RSI values of shape (n_rows, ..., len(periods)), unpadded
+        periods (Sequence[int]): Period of each column, in column order
+
+    Returns:
+        np.ndarray: The same matrix, padded.
+    """
+    n_rows: int = rsi_matrix.shape[0]
+    period_array: np.ndarray = np.asarray(list(periods))
+
+    # copy_from[c, k]: column k takes row periods[c] from column c
+    column_order: np.ndarray = np.arange(len(period_array))
+    copy_from: np.ndarray = ((column_order[:, None] < column_order[None, :])
+                             & (period_array[:, None] >= 2)
+                             & (period_array[:, None] < period_array[None, :])
+                             & (period_array[:, None] < n_rows))
+    source_columns, target_columns = np.nonzero(copy_from)
+    rows: np.ndarray = period_array[source_columns]
+    rsi_matrix[rows, ..., target_columns] = rsi_matrix[rows, ..., source_columns]
+
+    rsi_matrix[:1] = 0.0
+    rsi_matrix[1:2] = 100.0
+    return rsi_matrix
 
-class CumulatedGainsIndicator:
-    """Calculates cumulated gains over a specified time frame."""
+class RSIIndicator:
+    """Calculates the Relative Strength Index (RSI) over a specified time frame."""
 
     def __init__(self, indicator: np.ndarray, timeFrame: int):
         self.indicator: np.ndarray = indicator
         self.timeFrame: int = timeFrame
 
-    def getValue(self, index: int) -> float:
-        """
-        Calculate the cumulated gains for a given index.
+        # Pre-calculate all RSI values in one pass instead of re-summing the window per index
+        self.rsi_values: np.ndarray = self._calculate_all_rsi()
 
-        Args:
-            index (int): The index to calculate gains for.
+    def _calculate_all_rsi(self) -> np.ndarray:
+        """Calculate all RSI values at once from trailing sums of gains and losses."""
+        if len(self.indicator) == 0:
+            return np.zeros(0, dtype=float)
 
-        Returns:
-            float: The cumulated gains.
-        """
-        sumOfGains: float = 0
-        for i in range(max(1, index - self.timeFrame + 1), index + 1):
-            if self.indicator[i] > self.indicator[i - 1]:
-                sumOfGains += self.indicator[i] - self.indicator[i - 1]
-        return sumOfGains
+        return calculate_rsi_batch(self.indicator, [self.timeFrame], padding=False)[:, 0]
 
-class CumulatedLossesIndicator:
-    """Calculates cumulated losses over a specified time frame."""
-
-    def __init__(self, indicator: np.ndarray, timeFrame: int):
-        self.indicator: np.ndarray = indicator
-        self.timeFrame: int = timeFrame 
-
-    def getValue(self, index: int) -> float:
+    def compute_series(self) -> np.ndarray:
         """
-        Calculate the cumulated losses for a given index.
-
-        Args:
-            index (int): The index to calculate losses for.
+        Get the RSI values for every index.
 
         Returns:
-            float: The cumulated losses.
+            np.ndarray: The RSI series, same length as the input.
         """
-        sumOfLosses: float = 0
-        for i in range(max(1, index - self.timeFrame + 1), index + 1):
-            if self.indicator[i] < self.indicator[i - 1]:
-                sumOfLosses += self.indicator[i - 1] - self.indicator[i]
-        return sumOfLosses
-
-class AverageGainIndicator:
-    """Calculates average gains over a specified time frame."""
-
-    def __init__(self, indicator: np.ndarray, timeFrame: int):
-        self.cumulatedGains: CumulatedGainsIndicator = CumulatedGainsIndicator(indicator, timeFrame)
-        self.timeFrame: int = timeFrame
-
-    def getValue(self, index: int) -> float:
-        """
-        Calculate the average gain for a given index.
-
-        Args:
-            index (int): The index to calculate average gain for.
-
-        Returns:
-            float: The average gain.
-        """
-        realTimeFrame: int = min(self.timeFrame, index + 1)
-        return self.cumulatedGains.getValue(index) / realTimeFrame
-
-class AverageLossIndicator:
-    """Calculates average losses over a specified time frame."""
-
-    def __init__(self, indicator: np.ndarray, timeFrame: int):
-        self.cumulatedLosses: CumulatedLossesIndicator = CumulatedLossesIndicator(indicator, timeFrame)
-        self.timeFrame: int = timeFrame
-
-    def getValue(self, index: int) -> float:
-        """
-        Calculate the average loss for a given index.
-
-        Args:
-            index (int): The index to calculate average loss for.
-
-        Returns:
-            float: The average loss.
-        """
-        realTimeFrame: int = min(self.timeFrame, index + 1)
-        return self.cumulatedLosses.getValue(index) / realTimeFrame
-
-class RSIIndicator:
-    """Calculates the Relative Strength Index (RSI) over a specified time frame."""
-
-    def __init__(self, indicator: np.ndarray, timeFrame: int):
-        self.indicator: np.ndarray = indicator
-        self.timeFrame: int = timeFrame
-        self.averageGainIndicator: AverageGainIndicator = AverageGainIndicator(indicator, timeFrame)
-        self.averageLossIndicator: AverageLossIndicator = AverageLossIndicator(indicator, timeFrame)
+        return self.rsi_values
 
     def calculate(self, index: int) -> float:
         """
-        Calculate the RSI for a given index.
+        Get the RSI value for a given index.
 
         Args:
-            index (int): The index to calculate RSI for.
+            index (int): The index to get RSI for.
 
         Returns:
             float: The RSI value.
         """
         if index == 0:
-            return 0
-
-        averageLoss: float = self.averageLossIndicator.getValue(index)
-        if averageLoss == 0:
-            return 100
-
-        averageGain: float = self.averageGainIndicator.getValue(index)
-        relativeStrength: float = averageGain / averageLoss if averageLoss != 0 else float('inf')
+            return 0.0
 
-        ratio: float = 100 / (1 + relativeStrength)
-        return 100 - ratio
\ No newline at end of file
+        return float(self.rsi_values[index])
@@ -1,9 +1,35 @@
 import numpy as np
+from lib.indicators.SMA import prefix_window_sums, build_prefix_sums
+from typing import Tuple
+
+def log_return_prefix_sums(prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build prefix sums of daily log returns and squared log returns along the first axis.
+
+    Non-finite returns are summed as 0 and counted separately, so windows containing
+    them can be set to NaN. Shared between all volatility periods of one price series.
+
+    Args:
+        prices (np.ndarray): Array of price values, shape (n_rows,) or (n_rows, n_series)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Prefix sums of returns, of squared returns,
+        and prefix counts of non-finite returns (None when all are finite), each with
+        len(prices) rows.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns: np.ndarray = np.diff(np.log(np.asarray(prices, dtype=float)), axis=0)
+
+    finite: np.ndarray = np.isfinite(returns)
+    returns = np.where(finite, returns, 0.0)
+    invalid_prefix: np.ndarray = None if finite.all() else build_prefix_sums(~finite)
+    return build_prefix_sums(returns), build_prefix_sums(returns ** 2), invalid_prefix
 
 class RealizedVolatilityIndicator:
     """Calculates the Realized Volatility over a specified time frame."""
 
-    def __init__(self, indicator: np.ndarray, timeFrame: int = 21, trading_days: int = 252):
+    def __init__(self, indicator: np.ndarray, timeFrame: int = 21, trading_days: int = 252,
+                 return_prefix_sums: Tuple[np.ndarray, np.ndarray, np.ndarray] = None):
         """
         Initialize Realized Volatility calculator.
 
@@ -11,11 +37,55 @@ class RealizedVolatilityIndicator:
             indicator (np.ndarray): Array of price values
             timeFrame (int): Period for volatility calculation (default: 21 days)
             trading_days (int): Number of trading days in a year (default: 252)
+            return_prefix_sums (Tuple[np.ndarray, np.ndarray, np.ndarray]): Precomputed
+                log_return_prefix_sums of indicator (default: computed here)
         """
         self.indicator: np.ndarray = indicator
         self.timeFrame: int = timeFrame
         self.trading_days: int = trading_days
+        self.return_prefix_sums: Tuple[np.ndarray, np.ndarray, np.ndarray] = return_prefix_sums
         
+    def compute_series(self) -> np.ndarray:
+        """
+        Calculate the annualized Realized Volatility for every index.
+        Values are 0.0 until the lookback window is full.
+
+        Uses rolling sums of log returns and squared log returns, so the cost does
+        not depend on the window length.
+
+        Returns:
+            np.ndarray: The volatility series, same length as the input.
+        """
+        prices: np.ndarray = np.asarray(self.indicator, dtype=float)
+        volatility: np.ndarray = np.zeros(prices.shape, dtype=float)
+        if len(prices) < self.timeFrame:
+            return volatility
+
+        # A full window of timeFrame prices holds timeFrame - 1 daily returns
+        window: int = self.timeFrame - 1
+        if window < 2:
+            # Sample standard deviation is undefined for fewer than two returns
+            volatility[max(window, 0):] = np.nan
+            return volatility
+
+        return_prefix_sums = self.return_prefix_sums
+        if return_prefix_sums is None:
+            return_prefix_sums = log_return_prefix_sums(prices)
+        sum_prefix, square_prefix, invalid_prefix = return_prefix_sums
+        sums: np.ndarray = prefix_window_sums(sum_prefix, window)[window - 1:]
+        squared_sums: np.ndarray = prefix_window_sums(square_prefix, window)[window - 1:]
+
+        # Sample variance (ddof=1); rounding can leave tiny negatives where it is 0
+        variance: np.ndarray = (squared_sums - sums ** 2 / window) / (window - 1)
+        daily_vol: np.ndarray = np.sqrt(np.maximum(variance, 0.0))
+        if invalid_prefix is not None:
+            # Non-finite returns were summed as 0; their windows are undefined
+            daily_vol[prefix_window_sums(invalid_prefix, window)[window - 1:] > 0] = np.nan
+
+        # Annualize volatility and convert to percentage
+        volatility[window:] = daily_vol * np.sqrt(self.trading_days) * 100
+        return volatility
+
     def calculate(self, index: int) -> float:
         """
         Calculate the annualized Realized Volatility for a given index.
@@ -48,4 +118,4 @@ class RealizedVolatilityIndicator:
         # Annualize volatility and convert to percentage
         annual_vol: float = daily_vol * np.sqrt(self.trading_days) * 100
         
-        return float(annual_vol)
\ No newline at end of file
+        return float(annual_vol)
@@ -14,6 +14,27 @@ class PercentageChangeIndicator:
         self.indicator: np.ndarray = indicator
         self.timeFrame: int = timeFrame
 
+    def compute_series(self) -> np.ndarray:
+        """
+        Calculate the percentage change for every index.
+
+        Returns:
+            np.ndarray: The percentage change series, same length as the input.
+            Values are 0.0 where there's not enough history or the past value is 0.
+        """
+        values: np.ndarray = np.asarray(self.indicator, dtype=float)
+        pct_values: np.ndarray = np.zeros(values.shape, dtype=float)
+        lag: int = self.timeFrame - 1
+        if lag < 0 or len(values) <= lag:
+            return pct_values
+
+        current_values: np.ndarray = values[lag:]
+        past_values: np.ndarray = values[:len(values) - lag]
+        np.divide((current_values - past_values), past_values, out=pct_values[lag:],
+                  where=past_values != 0)
+        pct_values[lag:] *= 100.0
+        return pct_values
+
     def calculate(self, index: int) -> float:
         """
         Calculate the percentage change for a given index.
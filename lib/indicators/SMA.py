@@ -1,11 +1,124 @@
+from typing import Tuple
 import numpy as np
 
+def prefix_window_sums(prefix: np.ndarray, timeFrame: int) -> np.ndarray:
+    """
+    Turn prefix sums into trailing window sums along the first axis.
+
+    Given prefix[i] = sum(values[:i]), returns sum(values[max(0, i - timeFrame + 1):i + 1])
+    for every index i, using slices rather than gathers.
+
+    Args:
+        prefix (np.ndarray): Prefix sums with one more row than the values
+        timeFrame (int): Window length
+
+    Returns:
+        np.ndarray: Window sums with len(prefix) - 1 rows.
+    """
+    sums: np.ndarray = prefix[1:] - prefix[0]
+    if timeFrame < len(sums):
+        sums[timeFrame:] = prefix[timeFrame + 1:] - prefix[1:len(prefix) - timeFrame]
+    return sums
+
+def build_prefix_sums(values: np.ndarray) -> np.ndarray:
+    """Prefix sums along the first axis with a leading row of zeros, as prefix_window_sums expects."""
+    prefix: np.ndarray = np.zeros((len(values) + 1,) + np.shape(values)[1:], dtype=float)
+    np.cumsum(values, axis=0, dtype=float, out=prefix[1:])
+    return prefix
+
+def rolling_sum(values: np.ndarray, timeFrame: int) -> np.ndarray:
+    """
+    Sum the trailing window values[max(0, i - timeFrame + 1):i + 1] for every index
+    along the first axis.
+
+    Windows at the start of the array are partial. Uses prefix sums, so the cost is
+    O(n) regardless of the window length.
+
+    Args:
+        values (np.ndarray): Array of values, shape (n_rows,) or (n_rows, n_series)
+        timeFrame (int): Window length
+
+    Returns:
+        np.ndarray: Rolling sums, same shape as values.
+    """
+    return prefix_window_sums(build_prefix_sums(values), timeFrame)
+
+def rolling_mean_prefix_sums(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build the prefix sums rolling_mean needs, so several window lengths can share them.
+
+    Non-finite values are summed as 0 and counted separately, to keep a bad value from
+    leaking into every later window through the prefix sum.
+
+    Args:
+        values (np.ndarray): Array of values, shape (n_rows,) or (n_rows, n_series)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Prefix sums of the values and prefix counts of
+        non-finite values (None when every value is finite), each with len(values) + 1 rows.
+    """
+    values = np.asarray(values, dtype=float)
+    finite: np.ndarray = np.isfinite(values)
+    if finite.all():
+        return build_prefix_sums(values), None
+    return build_prefix_sums(np.where(finite, values, 0.0)), build_prefix_sums(~finite)
+
+def rolling_mean_from_prefix_sums(prefix_sums: Tuple[np.ndarray, np.ndarray], timeFrame: int) -> np.ndarray:
+    """
+    Average the trailing window of timeFrame values from rolling_mean_prefix_sums.
+
+    Args:
+        prefix_sums (Tuple[np.ndarray, np.ndarray]): Output of rolling_mean_prefix_sums
+        timeFrame (int): Window length
+
+    Returns:
+        np.ndarray: Rolling means, one row fewer than the prefix sums.
+    """
+    prefix, invalid_prefix = prefix_sums
+    window_sizes: np.ndarray = np.minimum(timeFrame, np.arange(len(prefix) - 1) + 1)
+    window_sizes = window_sizes.reshape((-1,) + (1,) * (prefix.ndim - 1))
+
+    means: np.ndarray = prefix_window_sums(prefix, timeFrame) / window_sizes
+    if invalid_prefix is not None:
+        means[prefix_window_sums(invalid_prefix, timeFrame) > 0] = np.nan
+    return means
+
+def rolling_mean(values: np.ndarray, timeFrame: int) -> np.ndarray:
+    """
+    Average the trailing window of timeFrame values for every index along the first axis.
+
+    Windows at the start of the array are partial and averaged over the values
+    available. A window containing a non-finite value yields NaN.
+
+    Args:
+        values (np.ndarray): Array of values, shape (n_rows,) or (n_rows, n_series)
+        timeFrame (int): Window length
+
+    Returns:
+        np.ndarray: Rolling means, same shape as values.
+    """
+    return rolling_mean_from_prefix_sums(rolling_mean_prefix_sums(values), timeFrame)
+
 class SMAIndicator:
     """Calculates the Simple Moving Average (SMA) over a specified time frame."""
 
-    def __init__(self, indicator: np.ndarray, timeFrame: int):
+    def __init__(self, indicator: np.ndarray, timeFrame: int,
+                 prefix_sums: Tuple[np.ndarray, np.ndarray] = None):
         self.indicator: np.ndarray = indicator
         self.timeFrame: int = timeFrame
+        # Optional rolling_mean_prefix_sums of indicator, shared between periods
+        self.prefix_sums: Tuple[np.ndarray, np.ndarray] = prefix_sums
+
+    def compute_series(self) -> np.ndarray:
+        """
+        Calculate the SMA values for every index.
+
+        Returns:
+            np.ndarray: The SMA series, same length as the input.
+        """
+        if self.prefix_sums is not None:
+            return rolling_mean_from_prefix_sums(self.prefix_sums, self.timeFrame)
+        return rolling_mean(self.indicator, self.timeFrame)
 
     def calculate(self, index: int) -> float:
         """
@@ -19,4 +132,4 @@ class SMAIndicator:
         """
         start_index: int = max(0, index - self.timeFrame + 1)
         window_values: np.ndarray = self.indicator[start_index:index + 1]
-        return float(np.mean(window_values))
\ No newline at end of file
+        return float(np.mean(window_values))
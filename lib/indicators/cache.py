@@ -0,0 +1,350 @@
+from lib.indicators.MarketIndicators import MarketIndicators, PRICE_COLUMNS, OutputBuffer
+from lib.indicators.incremental import calculate_incremental_features, incremental_lookback
+from lib.indicators.kernels import JIT_ENABLED
+
+from typing import List, Dict, Any, Callable, Tuple
+from urllib.parse import quote
+import pandas as pd
+import numpy as np
+import hashlib
+import shutil
+import json
+import uuid
+import os
+
+# Bumped whenever a kernel change alters results, so older entries are never served
+CACHE_VERSION: int = 1
+
+# Manifest of an entry: output column names, the input arrays it was calculated from,
+# and for tail recalculations the entry it continued and the length of that chain
+MANIFEST_FILE = 'manifest.json'
+
+# Tail recalculations continued from earlier results before a ticker is recalculated cold
+MAX_TAIL_CHAIN: int = 20
+
+def _index_values(index: pd.Index) -> np.ndarray:
+    """Dates of the index as a datetime64 array (report dates come back as date objects)."""
+    values: np.ndarray = np.asarray(index)
+    if values.dtype == object:
+        values = pd.to_datetime(index).values
+    return values
+
+def _first_difference(old: np.ndarray, new: np.ndarray) -> int:
+    """First row where two arrays differ, NaN equal to NaN; len(new) if none within both."""
+    n: int = min(len(old), len(new))
+    old, new = np.asarray(old[:n]), np.asarray(new[:n])
+    if old.dtype != new.dtype:
+        return 0
+    differs: np.ndarray = old != new
+    if np.issubdtype(new.dtype, np.floating):
+        differs &= ~(np.isnan(old) & np.isnan(new))
+    changed: np.ndarray = np.flatnonzero(differs)
+    return int(changed[0]) if len(changed) else n
+
+def _unchanged_rows(old_inputs: Dict[str, np.ndarray], inputs: Dict[str, np.ndarray]) -> int:
+    """Number of leading rows where every input array matches the old one."""
+    return min(_first_difference(old_inputs[name], values) for name, values in inputs.items())
+
+class IndicatorCache:
+    """
+    On-disk cache of calculated indicators, addressed by the content of their inputs.
+
+    An entry's key hashes the Date index and the Close/High/Low/Volume arrays together
+    with the resolved feature/parameter spec, so a ticker whose market data has not
+    changed is served without calculating anything. Each entry is a directory of .npy
+    files read back memory-mapped. The latest entry per ticker and spec is remembered,
+    and when only the end of a history changed (new bars or revised recent bars) the
+    unchanged rows are reused and only the tail is recalculated, like the incremental
+    mode. Entries are evicted least recently used once the cache exceeds max_bytes.
+
+    Only cold calculations are stored under the content address, so a content hit is
+    always what calculate_features would return. A tail result depends on the entry it
+    continued, so it is stored under a key derived from that parent and reached only
+    through the ticker's latest entry; after MAX_TAIL_CHAIN continuations, or in compact
+    mode where the stored EMA/MACD state is float32, the ticker is recalculated cold.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 2 * 1024 ** 3, calculator: MarketIndicators = None):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): Cache directory, created if missing
+            max_bytes (int): Size bound of the cached entries in bytes (default: 2 GiB)
+            calculator (MarketIndicators): Calculator used for tail recalculation and parameter defaults
+        """
+        self.path: str = path
+        self.max_bytes: int = max_bytes
+        self.calculator: MarketIndicators = calculator or MarketIndicators()
+        self.stats: Dict[str, int] = {'hits': 0, 'tails': 0, 'misses': 0, 'evictions': 0}
+        self._sizes: Dict[str, int] = None
+        os.makedirs(os.path.join(path, 'entries'), exist_ok=True)
+        os.makedirs(os.path.join(path, 'refs'), exist_ok=True)
+
+    def spec_key(self, features: List[str] = None, custom_params: Dict[str, Dict[str, Any]] = None,
+                 dtypes: Dict[str, Any] = None) -> str:
+        """
+        Hash of the resolved feature/parameter spec.
+
+        Args:
+            features (List[str]): Features to calculate (default: all)
+            custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+            dtypes (Dict[str, Any]): Compact mode dtype plan; compact results are cached separately
+
+        Returns:
+            str: Hex digest identifying the spec.
+        """
+        features, params = self.calculator.resolve_params(features, custom_params)
+        plan = {name: np.dtype(dtype).str for name, dtype in dtypes.items()} if dtypes is not None else None
+        # The compiled and NumPy EMA kernels agree only to float rounding, so their results are kept apart
+        spec: str = json.dumps({'version': CACHE_VERSION, 'features': features, 'params': params, 'dtypes': plan,
+                                'jit': JIT_ENABLED}, sort_keys=True, default=str)
+        return hashlib.sha256(spec.encode()).hexdigest()
+
+    def input_arrays(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Arrays the indicators depend on: the Date index and the price columns present in df."""
+        arrays: Dict[str, np.ndarray] = {'Date': _index_values(df.index)}
+        for column in PRICE_COLUMNS:
+            if column in df.columns:
+                arrays[column] = np.ascontiguousarray(df[column].values)
+        return arrays
+
+    def entry_key(self, spec_key: str, inputs: Dict[str, np.ndarray]) -> str:
+        """Content address of an entry: the spec hash and every input array's dtype and bytes."""
+        digest = hashlib.sha256(spec_key.encode())
+        for name, values in inputs.items():
+            digest.update(f"{name}:{values.dtype.str}:{len(values)}".encode())
+            digest.update(values.tobytes())
+        return digest.hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.path, 'entries', key)
+
+    def _ref_path(self, spec_key: str, ticker: str) -> str:
+        return os.path.join(self.path, 'refs', spec_key, quote(str(ticker), safe=''))
+
+    def tail_key(self, content_key: str, parent_key: str) -> str:
+        """Address of a tail recalculation: its content address and the entry it continued."""
+        return hashlib.sha256(f"{content_key}:{parent_key}".encode()).hexdigest()
+
+    def _load(self, key: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """Memory-maps an entry's (manifest, inputs, outputs), or returns None if it was evicted."""
+        directory: str = self._entry_dir(key)
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE)) as f:
+                manifest: Dict[str, List[str]] = json.load(f)
+            load = lambda name: np.load(os.path.join(directory, name), mmap_mode='r')
+            inputs = {name: load(f'input_{i}.npy') for i, name in enumerate(manifest['inputs'])}
+            outputs = {name: load(f'output_{i}.npy') for i, name in enumerate(manifest['outputs'])}
+        except FileNotFoundError:
+            return None
+        # Mark as recently used for eviction
+        os.utime(os.path.join(directory, MANIFEST_FILE))
+        return manifest, inputs, outputs
+
+    def _store(self, key: str, inputs: Dict[str, np.ndarray], outputs: Dict[str, np.ndarray],
+               parent: str = None, chain: int = 0) -> None:
+        """Writes an entry into a temporary directory and renames it into place."""
+        directory: str = self._entry_dir(key)
+        if os.path.exists(directory):
+            return
+        staging: str = os.path.join(self.path, 'entries', f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            for i, values in enumerate(inputs.values()):
+                np.save(os.path.join(staging, f'input_{i}.npy'), values)
+            for i, values in enumerate(outputs.values()):
+                np.save(os.path.join(staging, f'output_{i}.npy'), np.asarray(values))
+            with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+                json.dump({'inputs': list(inputs), 'outputs': list(outputs), 'parent': parent, 'chain': chain}, f)
+            os.rename(staging, directory)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.exists(directory):
+                raise
+            return
+        self._evict(key)
+
+    def _entry_size(self, key: str) -> int:
+        directory: str = self._entry_dir(key)
+        return sum(entry.stat().st_size for entry in os.scandir(directory))
+
+    def _evict(self, keep: str) -> None:
+        """Removes least recently used entries, other than keep, until the cache fits max_bytes."""
+        if self._sizes is None:
+            self._sizes = {entry.name: self._entry_size(entry.name)
+                           for entry in os.scandir(os.path.join(self.path, 'entries'))
+                           if entry.is_dir() and not entry.name.startswith('.tmp-')}
+        self._sizes[keep] = self._entry_size(keep)
+
+        total: int = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        def last_used(key: str) -> float:
+            try:
+                return os.stat(os.path.join(self._entry_dir(key), MANIFEST_FILE)).st_mtime
+            except FileNotFoundError:
+                return 0.0
+
+        for key in sorted((key for key in self._sizes if key != keep), key=last_used):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= self._sizes.pop(key)
+            self.stats['evictions'] += 1
+
+    def _remember(self, spec_key: str, ticker: str, key: str) -> None:
+        ref: str = self._ref_path(spec_key, ticker)
+        os.makedirs(os.path.dirname(ref), exist_ok=True)
+        with open(ref, 'w') as f:
+            f.write(key)
+
+    def _latest(self, spec_key: str, ticker: str) -> Tuple[str, Tuple[Dict[str, Any], Dict[str, np.ndarray], Dict[str, np.ndarray]]]:
+        """The key and loaded entry of the ticker's latest result, or None."""
+        try:
+            with open(self._ref_path(spec_key, ticker)) as f:
+                key: str = f.read().strip()
+        except FileNotFoundError:
+            return None
+        entry = self._load(key)
+        return (key, entry) if entry is not None else None
+
+    def _recalculate_tail(self, df: pd.DataFrame, inputs: Dict[str, np.ndarray], latest,
+                          features: List[str], params: Dict[str, Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Reuses the ticker's latest entry for the rows before the first changed input row.
+
+        Returns:
+            Dict[str, np.ndarray]: Indicator arrays for all rows of df, or None when the
+            latest entry uses other inputs, shares too few rows with df, or ends a chain
+            of MAX_TAIL_CHAIN tail recalculations.
+        """
+        manifest, old_inputs, old_outputs = latest
+        if list(old_inputs) != list(inputs) or manifest.get('chain', 0) >= MAX_TAIL_CHAIN:
+            return None
+
+        # Every output row before the first changed input row is still valid
+        unchanged: int = _unchanged_rows(old_inputs, inputs)
+        lookback: int = incremental_lookback(self.calculator, features, params)
+        if unchanged < lookback or unchanged >= len(df):
+            return None
+
+        last_values: Dict[str, Any] = {name.lower(): values[unchanged - 1] for name, values in old_outputs.items()}
+        tail_df: pd.DataFrame = calculate_incremental_features(
+            self.calculator, df.iloc[unchanged - lookback:], lookback, last_values, features, params)
+        return {name: np.concatenate((values[:unchanged], tail_df[name].values))
+                for name, values in old_outputs.items()}
+
+    def calculate_panel_features(self, data: Dict[str, pd.DataFrame],
+                                 features: List[str] = None,
+                                 custom_params: Dict[str, Dict[str, Any]] = None,
+                                 calculate: Callable[..., Dict[str, pd.DataFrame]] = None,
+                                 dtypes: Dict[str, Any] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Calculates indicators for many tickers, serving unchanged ones from the cache.
+
+        Tickers with a cached entry for their exact inputs are not calculated at all,
+        tickers whose history only changed at the end get their tail recalculated
+        (except in compact mode), and the rest are passed to calculate in one call;
+        every result is then cached.
+
+        Args:
+            data (Dict[str, pd.DataFrame]): Market data per ticker, as passed to calculate_features
+            features (List[str]): Features to calculate (default: all)
+            custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+            calculate (Callable): Calculates the missing tickers, called as
+                calculate(data, features, custom_params) (default: the calculator's
+                calculate_panel_features)
+            dtypes (Dict[str, Any]): Dtype per output column for compact mode, as in
+                calculate_features; calculate must then return compact frames too
+
+        Returns:
+            Dict[str, pd.DataFrame]: Indicator DataFrame per ticker, in the order of data.
+        """
+        calculate = calculate or (lambda data, features, params: self.calculator.calculate_panel_features(
+            data, features, params, dtypes))
+        features, params = self.calculator.resolve_params(features, custom_params)
+        spec_key: str = self.spec_key(features, params, dtypes)
+
+        outputs: Dict[str, Dict[str, np.ndarray]] = {}
+        missing: Dict[str, pd.DataFrame] = {}
+        keys: Dict[str, Tuple[str, Dict[str, np.ndarray]]] = {}
+        for ticker, df in data.items():
+            inputs: Dict[str, np.ndarray] = self.input_arrays(df)
+            key: str = self.entry_key(spec_key, inputs)
+            keys[ticker] = (key, inputs)
+
+            cached = self._load(key)
+            if cached is not None:
+                outputs[ticker] = cached[2]
+                self.stats['hits'] += 1
+                continue
+
+            latest = self._latest(spec_key, ticker)
+            if latest is not None:
+                latest_key, (manifest, old_inputs, old_outputs) = latest
+                # The ticker's own tail result for exactly these inputs
+                if list(old_inputs) == list(inputs) and len(old_inputs['Date']) == len(df) \
+                        and _unchanged_rows(old_inputs, inputs) == len(df):
+                    outputs[ticker] = old_outputs
+                    keys[ticker] = (latest_key, inputs)
+                    self.stats['hits'] += 1
+                    continue
+
+            # Compact entries hold float32 EMA/MACD state, too coarse to continue from
+            columns = None
+            if latest is not None and dtypes is None:
+                columns = self._recalculate_tail(df, inputs, latest[1], features, params)
+            if columns is not None:
+                manifest = latest[1][0]
+                tail_key: str = self.tail_key(key, latest[0])
+                outputs[ticker] = columns
+                keys[ticker] = (tail_key, inputs)
+                self._store(tail_key, inputs, columns, parent=latest[0], chain=manifest.get('chain', 0) + 1)
+                self.stats['tails'] += 1
+            else:
+                missing[ticker] = df
+                self.stats['misses'] += 1
+
+        results: Dict[str, pd.DataFrame] = calculate(missing, features, params) if missing else {}
+        output_names: List[str] = self.calculator.output_columns(features, params)
+        for ticker, indicators_df in results.items():
+            key, inputs = keys[ticker]
+            self._store(key, inputs, {name: indicators_df[name].values for name in output_names})
+
+        indicators_by_ticker: Dict[str, pd.DataFrame] = {}
+        for ticker, df in data.items():
+            if ticker in results:
+                indicators_by_ticker[ticker] = results[ticker]
+            else:
+                columns: Dict[str, np.ndarray] = outputs[ticker]
+                buffer = OutputBuffer({name: values.dtype for name, values in columns.items()}, len(df), dtypes)
+                buffer.write(columns)
+                indicators_by_ticker[ticker] = buffer.frame(df.index, None if dtypes is not None else df)
+            self._remember(spec_key, ticker, keys[ticker][0])
+        return indicators_by_ticker
+
+    def calculate_features(self, df: pd.DataFrame,
+                           features: List[str] = None,
+                           custom_params: Dict[str, Dict[str, Any]] = None,
+                           ticker: str = '',
+                           dtypes: Dict[str, Any] = None) -> pd.DataFrame:
+        """
+        Cached calculate_features for one ticker.
+
+        Args:
+            df (pd.DataFrame): Market data, as passed to calculate_features
+            features (List[str]): Features to calculate (default: all)
+            custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+            ticker (str): Ticker of df, needed to reuse its previous entry when only the tail changed
+            dtypes (Dict[str, Any]): Dtype per output column for compact mode, as in calculate_features
+
+        Returns:
+            pd.DataFrame: df with the indicator columns added, or the indicator columns only in compact mode.
+        """
+        def calculate(data, features, params):
+            return {name: self.calculator.calculate_features(frame, features, params, dtypes)
+                    for name, frame in data.items()}
+
+        return self.calculate_panel_features({ticker: df}, features, custom_params, calculate, dtypes)[ticker]
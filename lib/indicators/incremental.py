@@ -0,0 +1,157 @@
+from lib.indicators.MarketIndicators import MarketIndicators, PRICE_COLUMNS
+from lib.indicators.EMA import calculate_ema_batch
+
+from typing import List, Dict, Any
+import pandas as pd
+import numpy as np
+
+# EMA spans without stored state are warmed up until the seed's weight drops below this
+EMA_WARMUP_TOLERANCE: float = 1e-12
+
+def _ema_warmup(timeFrame: int) -> int:
+    """Number of bars after which the first value's weight in an EMA is below EMA_WARMUP_TOLERANCE."""
+    decay: float = 1 - 2.0 / (timeFrame + 1)
+    if decay <= 0:
+        return 1
+    return int(np.ceil(np.log(EMA_WARMUP_TOLERANCE) / np.log(decay)))
+
+def incremental_lookback(calculator: MarketIndicators, features: List[str] = None,
+                         custom_params: Dict[str, Dict[str, Any]] = None) -> int:
+    """
+    Number of bars up to and including the last stored bar needed to compute newer bars.
+
+    Rolling-window features need their longest window. EMA and the MACD signal line are
+    continued from their stored values, but the MACD fast/slow EMAs are not stored and
+    are warmed up from the start of the lookback instead.
+
+    Args:
+        calculator (MarketIndicators): Calculator whose defaults fill in the parameters
+        features (List[str]): Features to calculate (default: all)
+        custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+
+    Returns:
+        int: Lookback length in bars.
+    """
+    features, params = calculator.resolve_params(features, custom_params)
+    lookback: int = 1
+    for feature in ('RSI', 'SMA', 'RV', 'HLS', 'PCT'):
+        if feature in features and params[feature].get('periods'):
+            lookback = max(lookback, max(params[feature]['periods']))
+    if 'MACD' in features:
+        lookback = max(lookback,
+                       _ema_warmup(params['MACD'].get('fast_period', 12)),
+                       _ema_warmup(params['MACD'].get('slow_period', 26)))
+    return lookback
+
+def _macd_prefix(params: Dict[str, Dict[str, Any]]) -> str:
+    """Column prefix of the MACD outputs, e.g. MACD_12_26_9."""
+    macd: Dict[str, Any] = params['MACD']
+    return f"MACD_{macd.get('fast_period', 12)}_{macd.get('slow_period', 26)}_{macd.get('signal_period', 9)}"
+
+def missing_state(calculator: MarketIndicators, last_values: Dict[str, Any],
+                  features: List[str] = None,
+                  custom_params: Dict[str, Dict[str, Any]] = None) -> List[str]:
+    """
+    Stored columns that incremental continuation needs but last_values lacks.
+
+    last_values holds every column of the table, so a column it does not contain is
+    not uploaded and needs no state; a stored NULL counts as missing. The MACD signal
+    line is also needed when only the histogram is stored, as it is derived from it.
+
+    Args:
+        calculator (MarketIndicators): Calculator whose defaults fill in the parameters
+        last_values (Dict[str, Any]): Stored indicator values of the last stored bar
+        features (List[str]): Features to calculate (default: all)
+        custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+
+    Returns:
+        List[str]: Lower-case column names whose state is missing.
+    """
+    features, params = calculator.resolve_params(features, custom_params)
+    missing: List[str] = []
+    if 'EMA' in features:
+        missing += [f'ema_{period}' for period in params['EMA']['periods']
+                    if f'ema_{period}' in last_values and last_values[f'ema_{period}'] is None]
+    if 'MACD' in features:
+        prefix: str = _macd_prefix(params).lower()
+        signal: str = f'{prefix}_signal'
+        if (signal in last_values or f'{prefix}_histogram' in last_values) and last_values.get(signal) is None:
+            missing.append(signal)
+    if 'OBV' in features and 'obv' in last_values and last_values['obv'] is None:
+        missing.append('obv')
+    return missing
+
+def calculate_incremental_features(calculator: MarketIndicators, df: pd.DataFrame, n_stored: int,
+                                   last_values: Dict[str, Any],
+                                   features: List[str] = None,
+                                   custom_params: Dict[str, Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Calculates indicators only for the bars after the last stored one.
+
+    df holds the trailing n_stored bars up to and including the last stored bar, followed
+    by the new bars. When n_stored is at least incremental_lookback, the history before
+    df is not available, so EMA, the MACD signal line and OBV are continued from
+    last_values (the stored indicator row, keyed by lower-case column name). Otherwise df
+    is the ticker's whole history and everything is computed from its first bar.
+
+    Stored state is never re-seeded from the lookback window: if missing_state reports
+    any column, the ticker has to be recomputed from its first bar instead.
+
+    Args:
+        calculator (MarketIndicators): Indicator calculator
+        df (pd.DataFrame): Market data for the lookback and the new bars
+        n_stored (int): Number of leading rows of df that already have stored indicators
+        last_values (Dict[str, Any]): Stored indicator values of the last stored bar
+        features (List[str]): Features to calculate (default: all)
+        custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+
+    Returns:
+        pd.DataFrame: Indicator DataFrame for the new bars only.
+
+    Raises:
+        ValueError: If continuing from last_values and stored state is missing.
+    """
+    features, params = calculator.resolve_params(features, custom_params)
+    prices: Dict[str, np.ndarray] = {
+        column: df[column].values for column in PRICE_COLUMNS if column in df.columns
+    }
+    columns: Dict[str, np.ndarray] = calculator.calculate_arrays(prices, features, params)
+
+    anchor: int = n_stored - 1
+    if n_stored >= incremental_lookback(calculator, features, params) and last_values:
+        missing: List[str] = missing_state(calculator, last_values, features, params)
+        if missing:
+            raise ValueError(f"Stored state {missing} is missing, recompute the ticker from its first bar")
+        close_prices: np.ndarray = prices['Close'][anchor:]
+
+        # Continue stored EMAs from the last stored bar
+        if 'EMA' in features:
+            seeded_periods: List[int] = [period for period in params['EMA']['periods']
+                                         if last_values.get(f'ema_{period}') is not None]
+            if seeded_periods:
+                ema_matrix: np.ndarray = calculate_ema_batch(
+                    close_prices, seeded_periods,
+                    initial_values=[last_values[f'ema_{period}'] for period in seeded_periods])
+                for k, period in enumerate(seeded_periods):
+                    columns[f'EMA_{period}'][anchor:] = ema_matrix[:, k]
+
+        # Fast/slow EMAs are warmed up, the signal line continues from its stored value
+        if 'MACD' in features:
+            prefix: str = _macd_prefix(params)
+            stored_signal = last_values.get(f'{prefix}_signal'.lower())
+            if stored_signal is not None:
+                macd_line: np.ndarray = columns[f'{prefix}_line']
+                columns[f'{prefix}_signal'][anchor:] = calculate_ema_batch(
+                    macd_line[anchor:], [params['MACD'].get('signal_period', 9)],
+                    initial_values=[stored_signal])[:, 0]
+                columns[f'{prefix}_histogram'] = macd_line - columns[f'{prefix}_signal']
+
+        # OBV is a running total, so shift it to continue from the stored total
+        if 'OBV' in features and last_values.get('obv') is not None:
+            obv: np.ndarray = columns['OBV']
+            columns['OBV'] = obv - obv[anchor] + np.asarray(last_values['obv']).astype(obv.dtype)
+
+    new_rows: slice = slice(n_stored, None)
+    indicators_df: pd.DataFrame = pd.DataFrame(
+        {column: values[new_rows] for column, values in columns.items()}, index=df.index[new_rows])
+    return pd.concat([df.iloc[new_rows], indicators_df], axis=1)
@@ -0,0 +1,71 @@
+import numpy as np
+import os
+
+# Compiled kernels for the sequential recursions (EMA, OBV). They are used when numba
+# is installed and INDICATORS_JIT is not '0'; otherwise the NumPy implementations in
+# EMA.py and OBV.py run instead. The kernels are compiled with nogil, so threads
+# calculating different tickers run them in parallel.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+JIT_ENABLED: bool = numba is not None and os.getenv('INDICATORS_JIT', '1') != '0'
+
+def _jit(function):
+    """Compiles function without the GIL when the JIT is enabled, else leaves it unused."""
+    if not JIT_ENABLED:
+        return function
+    return numba.njit(nogil=True, cache=True)(function)
+
+@_jit
+def ema_recursion(values: np.ndarray, smoothing: np.ndarray, initial_values: np.ndarray) -> np.ndarray:
+    """
+    Run the EMA recursion ema[i] = x[i] * k + ema[i-1] * (1 - k) step by step.
+
+    Args:
+        values (np.ndarray): Input of shape (n_rows, n_series)
+        smoothing (np.ndarray): Smoothing factor k per period, shape (n_periods,)
+        initial_values (np.ndarray): EMA at row 0, shape (n_series, n_periods)
+
+    Returns:
+        np.ndarray: EMA values of shape (n_rows, n_series, n_periods).
+    """
+    n_rows, n_series = values.shape
+    n_periods = smoothing.shape[0]
+    result = np.empty((n_rows, n_series, n_periods))
+    if n_rows == 0:
+        return result
+
+    for j in range(n_series):
+        for k in range(n_periods):
+            result[0, j, k] = initial_values[j, k]
+    for i in range(1, n_rows):
+        for j in range(n_series):
+            value = values[i, j]
+            for k in range(n_periods):
+                result[i, j, k] = value * smoothing[k] + result[i - 1, j, k] * (1.0 - smoothing[k])
+    return result
+
+@_jit
+def obv_recursion(price_changes: np.ndarray, volume: np.ndarray, out: np.ndarray) -> None:
+    """
+    Accumulate OBV into out: volume is added on up days and subtracted on down days.
+
+    Args:
+        price_changes (np.ndarray): Close-to-close changes, shape (n_rows - 1, n_series)
+        volume (np.ndarray): Volume, shape (n_rows, n_series), same dtype as out
+        out (np.ndarray): OBV output, shape (n_rows, n_series)
+    """
+    n_rows, n_series = volume.shape
+    for j in range(n_series):
+        if n_rows > 0:
+            out[0, j] = volume[0, j]
+        for i in range(1, n_rows):
+            change = price_changes[i - 1, j]
+            if change > 0:
+                out[i, j] = out[i - 1, j] + volume[i, j]
+            elif change < 0:
+                out[i, j] = out[i - 1, j] - volume[i, j]
+            else:
+                out[i, j] = out[i - 1, j]
@@ -0,0 +1,124 @@
+from lib.indicators.MarketIndicators import MarketIndicators, PRICE_COLUMNS, OutputBuffer
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Dict, Any, Tuple
+import pandas as pd
+import numpy as np
+
+# Per-worker state set up by _init_worker: price arrays backed by shared memory
+_worker_prices: Dict[str, np.ndarray] = {}
+_worker_segments: List[SharedMemory] = []
+_worker_calculator: MarketIndicators = None
+
+def _init_worker(segments: Dict[str, Tuple[str, str, int]]) -> None:
+    """Attaches a worker process to the shared price segments."""
+    global _worker_calculator
+    for column, (name, dtype, n_rows) in segments.items():
+        segment = SharedMemory(name=name)
+        _worker_segments.append(segment)
+        _worker_prices[column] = np.ndarray((n_rows,), dtype=np.dtype(dtype), buffer=segment.buf)
+    _worker_calculator = MarketIndicators()
+
+def _calculate_ticker(task: Tuple[int, int, List[str], Dict[str, Dict[str, Any]]]) -> Dict[str, np.ndarray]:
+    """Calculates the indicator arrays for the rows [start, stop) of the shared prices."""
+    start, stop, features, custom_params = task
+    prices: Dict[str, np.ndarray] = {
+        column: values[start:stop].copy() for column, values in _worker_prices.items()
+    }
+    return _worker_calculator.calculate_arrays(prices, features, custom_params)
+
+def calculate_features_parallel(market_data: Dict[str, pd.DataFrame],
+                                features: List[str] = None,
+                                custom_params: Dict[str, Dict[str, Any]] = None,
+                                workers: int = 1,
+                                dtypes: Dict[str, Any] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Calculates indicators for each ticker in a pool of worker processes.
+
+    The OHLCV columns of all tickers are concatenated into shared memory once, so
+    workers only receive row ranges instead of pickled DataFrames. Results are
+    returned in the order of market_data.
+
+    Args:
+        market_data (Dict[str, pd.DataFrame]): Market data per ticker, as passed to calculate_features
+        features (List[str]): Features to calculate (default: all)
+        custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+        workers (int): Number of worker processes
+        dtypes (Dict[str, Any]): Dtype per output column for compact mode, as in calculate_features
+
+    Returns:
+        Dict[str, pd.DataFrame]: Indicator DataFrame per ticker, in the order of market_data.
+    """
+    tickers: List[str] = list(market_data.keys())
+    if not tickers:
+        return {}
+
+    lengths: np.ndarray = np.array([len(market_data[ticker]) for ticker in tickers])
+    offsets: np.ndarray = np.concatenate(([0], np.cumsum(lengths)))
+    n_rows: int = int(offsets[-1])
+
+    segments: List[SharedMemory] = []
+    try:
+        # Copy every price column of every ticker into one shared segment per column
+        segment_specs: Dict[str, Tuple[str, str, int]] = {}
+        for column in PRICE_COLUMNS:
+            if not all(column in market_data[ticker].columns for ticker in tickers):
+                continue
+            values: np.ndarray = np.concatenate([market_data[ticker][column].values for ticker in tickers])
+            segment = SharedMemory(create=True, size=max(values.nbytes, 1))
+            segments.append(segment)
+            np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf)[:] = values
+            segment_specs[column] = (segment.name, values.dtype.str, n_rows)
+
+        tasks = [(int(offsets[j]), int(offsets[j + 1]), features, custom_params) for j in range(len(tickers))]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(segment_specs,)) as executor:
+            # map yields results in task order, keeping the ticker order deterministic
+            columns_by_ticker: List[Dict[str, np.ndarray]] = list(executor.map(_calculate_ticker, tasks))
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    results: Dict[str, pd.DataFrame] = {}
+    for ticker, columns in zip(tickers, columns_by_ticker):
+        df: pd.DataFrame = market_data[ticker]
+        buffer = OutputBuffer({name: values.dtype for name, values in columns.items()}, len(df), dtypes)
+        buffer.write(columns)
+        results[ticker] = buffer.frame(df.index, None if dtypes is not None else df)
+    return results
+
+def calculate_features_threaded(market_data: Dict[str, pd.DataFrame],
+                                features: List[str] = None,
+                                custom_params: Dict[str, Dict[str, Any]] = None,
+                                workers: int = 1,
+                                dtypes: Dict[str, Any] = None,
+                                calculator: MarketIndicators = None) -> Dict[str, pd.DataFrame]:
+    """
+    Calculates indicators for each ticker in a pool of threads.
+
+    The compiled kernels (see kernels.JIT_ENABLED) and most NumPy operations release
+    the GIL, so threads calculate tickers in parallel without spawning processes or
+    copying prices into shared memory. Every calculation keeps its intermediates in
+    its own context, so all threads share one calculator. Results are returned in
+    the order of market_data.
+
+    Args:
+        market_data (Dict[str, pd.DataFrame]): Market data per ticker, as passed to calculate_features
+        features (List[str]): Features to calculate (default: all)
+        custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+        workers (int): Number of threads
+        dtypes (Dict[str, Any]): Dtype per output column for compact mode, as in calculate_features
+        calculator (MarketIndicators): Calculator shared by the threads (default: a new one)
+
+    Returns:
+        Dict[str, pd.DataFrame]: Indicator DataFrame per ticker, in the order of market_data.
+    """
+    calculator = calculator or MarketIndicators()
+
+    def calculate(df: pd.DataFrame) -> pd.DataFrame:
+        return calculator.calculate_features(df, features, custom_params, dtypes)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='indicators') as executor:
+        return dict(zip(market_data.keys(), executor.map(calculate, market_data.values())))
@@ -0,0 +1,317 @@
+from lib.indicators.MarketIndicators import MarketIndicators
+from lib.indicators.EMA import ema_chunk_plan
+from lib.indicators.kernels import JIT_ENABLED
+
+from collections import deque
+from typing import List, Dict, Any, Callable
+import numpy as np
+
+class _RollingSum:
+    """
+    Trailing window sum over pushed values.
+
+    Keeps the running total and the last timeFrame + 1 prefix totals, so each sum is
+    the same subtraction of prefix sums that prefix_window_sums does in the batch path.
+    """
+
+    def __init__(self, timeFrame: int):
+        self.total: float = 0.0
+        self.prefixes: deque = deque([0.0], maxlen=timeFrame + 1)
+
+    def push(self, value: float) -> float:
+        """Adds the next value and returns the sum of the current window."""
+        self.total = self.total + value
+        self.prefixes.append(self.total)
+        return self.total - self.prefixes[0]
+
+class _TrailingSums:
+    """
+    Trailing window sums for several lengths, each added up oldest value first
+    like trailing_window_sums in the batch path.
+    """
+
+    def __init__(self, timeFrames: List[int]):
+        self.timeFrames: List[int] = list(timeFrames)
+        self.values: deque = deque(maxlen=max(self.timeFrames))
+
+    def push(self, value: float) -> List[float]:
+        """Adds the next value and returns the sum of each window, in timeFrames order."""
+        self.values.append(value)
+        values: List[float] = list(self.values)
+        sums: List[float] = []
+        for timeFrame in self.timeFrames:
+            total: float = 0.0
+            for item in values[-timeFrame:]:
+                total += item
+            sums.append(total)
+        return sums
+
+class _RollingMean:
+    """Trailing window mean with partial windows at the start, as rolling_mean."""
+
+    def __init__(self, timeFrame: int):
+        self.timeFrame: int = timeFrame
+        self.count: int = 0
+        self.sums: _RollingSum = _RollingSum(timeFrame)
+        self.invalid: _RollingSum = _RollingSum(timeFrame)
+
+    def push(self, value: float) -> float:
+        """Adds the next value and returns the mean of the current window."""
+        finite: bool = bool(np.isfinite(value))
+        window_sum: float = self.sums.push(value if finite else 0.0)
+        invalid: float = self.invalid.push(0.0 if finite else 1.0)
+        self.count += 1
+        if invalid > 0:
+            return np.nan
+        return window_sum / min(self.timeFrame, self.count)
+
+class _EMAState:
+    """
+    EMAs for a group of periods, following the same chunked closed form as
+    calculate_ema_batch (or the plain recursion when the compiled kernels are
+    enabled) so every value matches the batch result bit for bit.
+    """
+
+    def __init__(self, timeFrames: List[int]):
+        self.smoothing, self.recursive, self.chunk_size, self.powers = ema_chunk_plan(timeFrames)
+        self.recursive_smoothing: np.ndarray = self.smoothing[self.recursive]
+        self.count: int = 0
+        self.last: np.ndarray = None
+        self.chunk_start: np.ndarray = None
+        self.scaled_sums: np.ndarray = None
+
+    def push(self, value: float) -> np.ndarray:
+        """Adds the next value and returns the EMA of every period."""
+        value = np.float64(value)
+        if self.count == 0:
+            result: np.ndarray = np.full(len(self.recursive_smoothing), value)
+        elif JIT_ENABLED:
+            result = value * self.recursive_smoothing + self.last * (1.0 - self.recursive_smoothing)
+        else:
+            step: int = (self.count - 1) % self.chunk_size
+            if step == 0:
+                self.chunk_start = self.last
+                self.scaled_sums = value / self.powers[0]
+            else:
+                self.scaled_sums = self.scaled_sums + value / self.powers[step]
+            result = self.powers[step] * (self.chunk_start + self.recursive_smoothing * self.scaled_sums)
+        self.last = result
+        self.count += 1
+
+        ema_values: np.ndarray = np.full(len(self.smoothing), value)
+        ema_values[self.recursive] = result
+        return ema_values
+
+class MarketIndicatorsStream:
+    """
+    Calculates technical indicators bar by bar.
+
+    Each indicator keeps only its rolling state (EMA recursion, window prefix sums,
+    the trailing gains/losses, running OBV), so a new bar costs O(1) per indicator,
+    or O(period) for RSI, regardless of history length. Values are identical to
+    MarketIndicators.calculate_features over the same bars.
+    """
+
+    def __init__(self, features: List[str] = None,
+                 custom_params: Dict[str, Dict[str, Any]] = None,
+                 calculator: MarketIndicators = None):
+        """
+        Initialize the stream.
+
+        Args:
+            features (List[str]): Features to calculate (default: all)
+            custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+            calculator (MarketIndicators): Calculator providing the defaults (default: a new one)
+        """
+        calculator = calculator or MarketIndicators()
+        self.features, self.params = calculator.resolve_params(features, custom_params)
+        self.count: int = 0
+        self.previous_close: float = None
+
+        builders: Dict[str, Callable] = {
+            'RSI': self._rsi_updater,
+            'SMA': self._sma_updater,
+            'EMA': self._ema_updater,
+            'MACD': self._macd_updater,
+            'RV': self._rv_updater,
+            'HLS': self._hls_updater,
+            'OBV': self._obv_updater,
+            'PCT': self._pct_updater
+        }
+        spans: List[int] = calculator.shared_ema_spans(self.features, self.params)
+        self._ema_state: _EMAState = _EMAState(spans) if spans else None
+        self._ema_index: Dict[int, int] = {span: k for k, span in enumerate(spans)}
+        self._shared_emas: np.ndarray = None
+        self._updaters: List[Callable] = [builders[feature](self.params[feature])
+                                          for feature in self.features if feature in builders]
+
+    def _rsi_updater(self, params: Dict[str, Any]) -> Callable:
+        periods: List[int] = list(params['periods'])
+        gain_sums: _TrailingSums = _TrailingSums(periods)
+        loss_sums: _TrailingSums = _TrailingSums(periods)
+
+        # Warm-up padding: row j of column k comes from the earlier column with period j
+        padding_sources: List[Dict[int, int]] = [
+            {j: c for c, j in enumerate(periods[:k]) if 2 <= j < period}
+            for k, period in enumerate(periods)
+        ]
+
+        def update(bar: Dict[str, float], index: int, columns: Dict[str, Any]) -> None:
+            gain: float = 0.0
+            loss: float = 0.0
+            if self.previous_close is not None:
+                change: float = bar['Close'] - self.previous_close
+                gain = change if change > 0 else 0.0
+                loss = -change if change < 0 else 0.0
+
+            raw: List[float] = []
+            for period, window_gain, window_loss in zip(periods, gain_sums.push(gain), loss_sums.push(loss)):
+                realTimeFrame: int = min(period, index + 1)
+                averageGain: float = window_gain / realTimeFrame
+                averageLoss: float = window_loss / realTimeFrame
+                raw.append(100 - 100 / (1 + averageGain / averageLoss) if averageLoss != 0 else 100.0)
+
+            for k, period in enumerate(periods):
+                if index == 0:
+                    value: float = 0.0
+                elif index == 1:
+                    value = 100.0
+                else:
+                    value = raw[padding_sources[k][index]] if index in padding_sources[k] else raw[k]
+                columns[f'RSI_{period}'] = value
+        return update
+
+    def _sma_updater(self, params: Dict[str, Any]) -> Callable:
+        means: Dict[int, _RollingMean] = {period: _RollingMean(period) for period in params['periods']}
+
+        def update(bar: Dict[str, float], index: int, columns: Dict[str, Any]) -> None:
+            for period, mean in means.items():
+                columns[f'SMA_{period}'] = mean.push(bar['Close'])
+        return update
+
+    def _ema_updater(self, params: Dict[str, Any]) -> Callable:
+        def update(bar: Dict[str, float], index: int, columns: Dict[str, Any]) -> None:
+            for period in params['periods']:
+                columns[f'EMA_{period}'] = self._shared_emas[self._ema_index[period]]
+        return update
+
+    def _macd_updater(self, params: Dict[str, Any]) -> Callable:
+        fast_period: int = params.get('fast_period', 12)
+        slow_period: int = params.get('slow_period', 26)
+        signal_period: int = params.get('signal_period', 9)
+        signal_state: _EMAState = _EMAState([signal_period])
+        prefix: str = f"MACD_{fast_period}_{slow_period}_{signal_period}"
+
+        def update(bar: Dict[str, float], index: int, columns: Dict[str, Any]) -> None:
+            macd_value = (self._shared_emas[self._ema_index[fast_period]]
+                          - self._shared_emas[self._ema_index[slow_period]])
+            signal_value = signal_state.push(macd_value)[0]
+            columns[f'{prefix}_line'] = macd_value
+            columns[f'{prefix}_signal'] = signal_value
+            columns[f'{prefix}_histogram'] = macd_value - signal_value
+        return update
+
+    def _rv_updater(self, params: Dict[str, Any]) -> Callable:
+        trading_days: int = params.get('trading_days', 252)
+        periods: List[int] = list(params['periods'])
+        windows: Dict[int, int] = {period: period - 1 for period in periods}
+        sums: Dict[int, _RollingSum] = {period: _RollingSum(windows[period]) for period in periods if windows[period] >= 2}
+        squared_sums: Dict[int, _RollingSum] = {period: _RollingSum(windows[period]) for period in sums}
+        invalid: Dict[int, _RollingSum] = {period: _RollingSum(windows[period]) for period in sums}
+        state: Dict[str, float] = {'log_price': None}
+
+        def update(bar: Dict[str, float], index: int, columns: Dict[str, Any]) -> None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_price = np.log(np.float64(bar['Close']))
+                daily_return = None
+                if state['log_price'] is not None:
+                    daily_return = log_price - state['log_price']
+            state['log_price'] = log_price
+
+            finite: bool = daily_return is not None and bool(np.isfinite(daily_return))
+            if finite is False and daily_return is not None:
+                daily_return = 0.0
+            for period in periods:
+                window: int = windows[period]
+                if period not in sums:
+                    # Sample standard deviation is undefined for fewer than two returns
+                    columns[f'RV_{period}'] = np.nan if index >= max(window, 0) else 0.0
+                    continue
+
+                if daily_return is not None:
+                    window_sum = sums[period].push(daily_return)
+                    squared_sum = squared_sums[period].push(daily_return * daily_return)
+                    invalid_count = invalid[period].push(0.0 if finite else 1.0)
+                if index < window:
+                    columns[f'RV_{period}'] = 0.0
+                    continue
+
+                variance = (squared_sum - window_sum * window_sum / window) / (window - 1)
+                daily_vol = np.nan if invalid_count > 0 else np.sqrt(np.maximum(variance, 0.0))
+                columns[f'RV_{period}'] = daily_vol * np.sqrt(trading_days) * 100
+        return update
+
+    def _hls_updater(self, params: Dict[str, Any]) -> Callable:
+        means: Dict[int, _RollingMean] = {period: _RollingMean(period) for period in params['periods']}
+
+        def update(bar: Dict[str, float], index: int, columns: Dict[str, Any]) -> None:
+            daily_spread = ((np.float64(bar['High']) - bar['Low']) / bar['Low']) * 100
+            for period, mean in means.items():
+                columns[f'HLS_{period}'] = mean.push(daily_spread)
+        return update
+
+    def _obv_updater(self, params: Dict[str, Any]) -> Callable:
+        state: Dict[str, Any] = {'first_volume': None, 'signed_total': 0}
+
+        def update(bar: Dict[str, float], index: int, columns: Dict[str, Any]) -> None:
+            volume = bar['Volume']
+            if np.isfinite(volume) and float(volume).is_integer():
+                volume = int(volume)
+
+            if state['first_volume'] is None:
+                state['first_volume'] = volume
+                columns['OBV'] = volume
+                return
+
+            change: float = bar['Close'] - self.previous_close
+            signed_volume = volume if change > 0 else (-volume if change < 0 else 0)
+            state['signed_total'] = state['signed_total'] + signed_volume
+            columns['OBV'] = state['signed_total'] + state['first_volume']
+        return update
+
+    def _pct_updater(self, params: Dict[str, Any]) -> Callable:
+        periods: List[int] = list(params['periods'])
+        closes: deque = deque(maxlen=max([period for period in periods] + [1]))
+
+        def update(bar: Dict[str, float], index: int, columns: Dict[str, Any]) -> None:
+            closes.append(np.float64(bar['Close']))
+            for period in periods:
+                lag: int = period - 1
+                value: float = 0.0
+                if 0 <= lag <= index:
+                    past_value = closes[-1 - lag]
+                    if past_value != 0:
+                        value = ((closes[-1] - past_value) / past_value) * 100.0
+                columns[f'PCT_{period}'] = value
+        return update
+
+    def update(self, bar: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Adds the next bar and returns the indicator values for it.
+
+        Args:
+            bar (Dict[str, float]): Bar with 'Close', plus 'High'/'Low' for HLS and 'Volume' for OBV
+
+        Returns:
+            Dict[str, Any]: Indicator values keyed by the same column names as calculate_features.
+        """
+        if self._ema_state is not None:
+            self._shared_emas = self._ema_state.push(bar['Close'])
+
+        columns: Dict[str, Any] = {}
+        for update in self._updaters:
+            update(bar, self.count, columns)
+
+        self.previous_close = bar['Close']
+        self.count += 1
+        return columns
@@ -0,0 +1,191 @@
+from lib.indicators.MarketIndicators import MarketIndicators
+
+from concurrent.futures import ProcessPoolExecutor, Future
+from collections import deque
+from typing import Iterable, Callable, Dict, List, Any, Tuple
+import pandas as pd
+import threading
+import queue
+import time
+
+# Marks the end of a stage's output
+_DONE = object()
+
+# Calculator of a compute worker process, created on its first task
+_worker_calculator: MarketIndicators = None
+
+class StageStats:
+    """Counts the tickers, rows and busy time of one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.items: int = 0
+        self.rows: int = 0
+        self.busy_seconds: float = 0.0
+        self.wall_seconds: float = 0.0
+
+    def add(self, rows: int, seconds: float) -> None:
+        """Records one processed ticker."""
+        self.items += 1
+        self.rows += rows
+        self.busy_seconds += seconds
+
+    def summary(self) -> str:
+        """
+        Describe the stage's throughput.
+
+        Returns:
+            str: Tickers and rows processed, rows per busy second, and the share of the
+            pipeline's wall time the stage was busy.
+        """
+        rate = self.rows / self.busy_seconds if self.busy_seconds > 0 else 0.0
+        share = 100 * self.busy_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+        return (f"{self.name}: {self.items} tickers, {self.rows} rows, {self.busy_seconds:.2f}s busy "
+                f"({rate:.0f} rows/s, {share:.0f}% of {self.wall_seconds:.2f}s wall)")
+
+def _calculate(task: Tuple[pd.DataFrame, List[str], Dict[str, Dict[str, Any]], Dict[str, Any]]) -> Tuple[pd.DataFrame, float]:
+    """Calculates one ticker's indicators and returns them with the time taken."""
+    global _worker_calculator
+    df, features, custom_params, dtypes = task
+    if _worker_calculator is None:
+        _worker_calculator = MarketIndicators()
+    started = time.perf_counter()
+    indicators_df = _worker_calculator.calculate_features(df, features, custom_params, dtypes)
+    return indicators_df, time.perf_counter() - started
+
+def run_pipeline(source: Iterable[Tuple[str, pd.DataFrame]],
+                 upload: Callable[[str, pd.DataFrame], None],
+                 features: List[str] = None,
+                 custom_params: Dict[str, Dict[str, Any]] = None,
+                 workers: int = 1,
+                 queue_size: int = 4,
+                 dtypes: Dict[str, Any] = None) -> Dict[str, StageStats]:
+    """
+    Runs fetch, indicator calculation and upload as concurrent stages.
+
+    Each stage runs in its own thread and hands tickers to the next through a bounded
+    queue, so a fast stage blocks instead of buffering unbounded data. With workers > 1
+    the calculation is spread over a process pool, keeping up to workers tickers in
+    flight; tickers are uploaded in source order either way.
+
+    Args:
+        source (Iterable[Tuple[str, pd.DataFrame]]): (ticker, market data) pairs, e.g. stream_market_data
+        upload (Callable[[str, pd.DataFrame], None]): Called with each ticker and its indicators
+        features (List[str]): Features to calculate (default: all)
+        custom_params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+        workers (int): Number of calculation processes (1 calculates in the pipeline thread)
+        queue_size (int): Capacity of each queue between stages, in tickers
+        dtypes (Dict[str, Any]): Dtype per output column for compact mode, as in calculate_features
+
+    Returns:
+        Dict[str, StageStats]: Statistics of the 'fetch', 'compute' and 'upload' stages.
+    """
+    fetched: queue.Queue = queue.Queue(maxsize=queue_size)
+    calculated: queue.Queue = queue.Queue(maxsize=queue_size)
+    stats: Dict[str, StageStats] = {name: StageStats(name) for name in ('fetch', 'compute', 'upload')}
+    stop = threading.Event()
+    errors: List[BaseException] = []
+
+    def put(target: queue.Queue, item: Any) -> bool:
+        # Block while the queue is full, but give up once another stage has failed
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(source_queue: queue.Queue) -> Any:
+        while not stop.is_set():
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def fetch_stage() -> None:
+        iterator = iter(source)
+        try:
+            while True:
+                started = time.perf_counter()
+                item = next(iterator, _DONE)
+                if item is _DONE:
+                    break
+                stats['fetch'].add(len(item[1]), time.perf_counter() - started)
+                if not put(fetched, item):
+                    return
+            put(fetched, _DONE)
+        finally:
+            # Release the source's database cursor if the pipeline stopped early
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+    def compute_stage(executor: ProcessPoolExecutor) -> None:
+        pending: deque = deque()
+
+        def forward() -> bool:
+            ticker, rows, future = pending.popleft()
+            indicators_df, seconds = future.result()
+            stats['compute'].add(rows, seconds)
+            return put(calculated, (ticker, indicators_df))
+
+        while True:
+            item = get(fetched)
+            if item is _DONE:
+                break
+            ticker, df = item
+            task = (df, features, custom_params, dtypes)
+            if executor is None:
+                future = Future()
+                future.set_result(_calculate(task))
+            else:
+                future = executor.submit(_calculate, task)
+            pending.append((ticker, len(df), future))
+            if len(pending) >= max(workers, 1) and not forward():
+                return
+        while pending and not stop.is_set():
+            if not forward():
+                return
+        put(calculated, _DONE)
+
+    def upload_stage() -> None:
+        while True:
+            item = get(calculated)
+            if item is _DONE:
+                break
+            ticker, indicators_df = item
+            started = time.perf_counter()
+            upload(ticker, indicators_df)
+            stats['upload'].add(len(indicators_df), time.perf_counter() - started)
+
+    def run_stage(stage: Callable, *args) -> None:
+        try:
+            stage(*args)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    started = time.perf_counter()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        threads = [
+            threading.Thread(target=run_stage, args=(fetch_stage,), name='pipeline-fetch'),
+            threading.Thread(target=run_stage, args=(compute_stage, executor), name='pipeline-compute'),
+            threading.Thread(target=run_stage, args=(upload_stage,), name='pipeline-upload')
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if errors:
+        raise errors[0]
+
+    wall_seconds = time.perf_counter() - started
+    for stage in stats.values():
+        stage.wall_seconds = wall_seconds
+    return stats
@@ -0,0 +1,282 @@
+from lib.models.EquityIndicators import EquityIndicators
+from lib.models.IndexIndicators import IndexIndicators
+from lib.indicators.MarketIndicators import MarketIndicators
+from lib.indicators.parallel import calculate_features_parallel, calculate_features_threaded
+from lib.indicators.incremental import calculate_incremental_features, incremental_lookback, missing_state
+from lib.indicators.cache import IndicatorCache
+from lib.db.incremental import get_latest_indicators, get_market_data_window
+from lib.db.market_data import fetch_market_data, stream_market_data
+from lib.db.bulk import column_mapping, column_dtypes, indicator_frame, copy_dataframe, upsert_dataframe
+from lib.pipeline import run_pipeline
+from lib.backup import BackupWriter
+
+from typing import List, Dict, Any
+import contextlib
+import os
+
+# Target table name -> indicator model
+TABLES = {model.__tablename__: model for model in (EquityIndicators, IndexIndicators)}
+
+class IndicatorJob:
+    """One universe of tickers with the features to calculate and the table to upload to."""
+
+    def __init__(self, name: str, data_type: str, tickers: List[str], features: List[str],
+                 params: Dict[str, Dict[str, Any]] = None, table: str = None):
+        """
+        Initialize a job.
+
+        Args:
+            name (str): Job name, used to select jobs from the command line
+            data_type (str): Market data type of the tickers ('equity' or 'index')
+            tickers (List[str]): Tickers to calculate
+            features (List[str]): Features to calculate
+            params (Dict[str, Dict[str, Any]]): Parameter overrides per feature
+            table (str): Target table in TABLES (default: '<data_type>_indicators')
+        """
+        self.name: str = name
+        self.data_type: str = data_type
+        self.tickers: List[str] = list(tickers)
+        self.features: List[str] = list(features)
+        self.custom_params: Dict[str, Dict[str, Any]] = params or {}
+        self.table: str = table or f"{data_type}_indicators"
+        if self.table not in TABLES:
+            raise ValueError(f"Unknown target table '{self.table}' for job '{name}', expected one of {list(TABLES)}")
+        self.model = TABLES[self.table]
+
+        # Table column -> indicator column, from the calculator's output names and the table metadata
+        output_dtypes = MarketIndicators().output_dtypes(self.features, self.custom_params)
+        self.output_columns: List[str] = list(output_dtypes.keys())
+        self.columns: Dict[str, str] = column_mapping(self.model.__table__, self.output_columns)
+        self.unmapped_columns: List[str] = [name for name in self.output_columns if name not in self.columns.values()]
+        # Dtype per indicator column for compact mode (float32 for Float(4) columns), checked against the table
+        self.dtypes: Dict[str, Any] = column_dtypes(self.model.__table__, self.columns, output_dtypes)
+
+def load_jobs(path: str) -> List[IndicatorJob]:
+    """
+    Read the job spec from a TOML or YAML file.
+
+    The file holds a list of jobs under the 'jobs' key, each with the IndicatorJob
+    arguments (name, data_type, tickers, features, params, table).
+
+    Args:
+        path (str): Path to a .toml, .yaml or .yml file
+
+    Returns:
+        List[IndicatorJob]: The jobs in file order.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.toml':
+        import tomllib
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+    elif extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML job specs require PyYAML (pip install pyyaml)") from e
+        with open(path) as f:
+            spec = yaml.safe_load(f)
+    else:
+        raise ValueError(f"Unsupported job spec format '{extension}', expected .toml, .yaml or .yml")
+
+    return [IndicatorJob(**job) for job in spec.get('jobs', [])]
+
+def upload_indicators(db_session, job, indicators_df, ticker, mode='upsert'):
+    print(f"\n[DEBUG] Starting upload_indicators for {ticker}")
+    print(f"[DEBUG] Indicators DataFrame shape: {indicators_df.shape}")
+    
+    try:
+        with db_session() as session:
+            # Delete existing records for this ticker when replacing its history
+            deleted_count = 0
+            if mode == 'replace':
+                deleted_count = session.query(job.model)\
+                                     .filter(job.model.ticker == ticker)\
+                                     .delete()
+            
+            print(f"[DEBUG] Deleted {deleted_count} existing records for {ticker}")
+            
+            print("[DEBUG] Building indicator rows")
+            records = indicator_frame(indicators_df, ticker, job.columns)
+            
+            if mode == 'upsert':
+                # Stage all rows, then write only new or changed ones
+                print("[DEBUG] Starting staged upsert")
+                inserted_count = upsert_dataframe(session, job.model.__table__, records)
+            else:
+                # Stream all rows into the table in one COPY
+                print("[DEBUG] Starting bulk copy")
+                inserted_count = copy_dataframe(session, job.model.__table__, records)
+            
+            # Commit all changes
+            session.commit()
+            
+            print(f"[SUCCESS] Successfully processed {len(indicators_df)} indicators for {ticker}")
+            print(f"         Deleted: {deleted_count}, Inserted/updated: {inserted_count}")
+            
+    except Exception as e:
+        print(f"[ERROR] Error in upload_indicators for {ticker}: {str(e)}")
+        session.rollback()
+        raise
+
+def open_backup(backup_dir, job):
+    # Parquet dataset per job under backup_dir, written in the background; None disables backups
+    if not backup_dir:
+        return contextlib.nullcontext()
+    return BackupWriter(os.path.join(backup_dir, job.name))
+
+def save_backup(backup, indicators_df, ticker):
+    if backup is None:
+        return
+    print(f"[DEBUG] Queueing Parquet backup for {ticker}")
+    backup.submit(ticker, indicators_df)
+
+def run_incremental_update(db_session, indicator_calculator, job):
+    print(f"\n[DEBUG] Starting incremental update for job {job.name}")
+    
+    # Bars needed before the new ones, and the last stored indicator row per ticker
+    lookback = incremental_lookback(indicator_calculator, job.features, job.custom_params)
+    latest_indicators = get_latest_indicators(db_session, job.model, job.tickers)
+    print(f"[DEBUG] Lookback: {lookback} bars, stored tickers: {list(latest_indicators.keys())}")
+    
+    for ticker in job.tickers:
+        last_values = latest_indicators.get(ticker, {})
+        # Without the stored EMA/MACD/OBV state the ticker is recomputed from its first bar
+        missing = missing_state(indicator_calculator, last_values, job.features, job.custom_params) if last_values else []
+        if missing:
+            print(f"[DEBUG] {ticker}: stored state {missing} is missing, recomputing full history")
+            last_values = {}
+        df, n_stored = get_market_data_window(
+            db_session,
+            ticker,
+            last_date=last_values.get('report_date'),
+            lookback=lookback,
+            data_type=job.data_type
+        )
+        print(f"[DEBUG] {ticker}: {n_stored} stored bars in lookback, {len(df) - n_stored} new bars")
+        if len(df) == n_stored:
+            continue
+        
+        indicators_df = calculate_incremental_features(
+            indicator_calculator,
+            df,
+            n_stored,
+            last_values,
+            features=job.features,
+            custom_params=job.custom_params
+        )
+        upload_indicators(db_session, job, indicators_df, ticker, mode='replace' if missing else 'append')
+
+def run_streaming_job(db_session, job, workers=1, replace=False, backup_dir=None, compact=False):
+    with open_backup(backup_dir, job) as backup:
+        # Fetch, calculate and upload concurrently, one ticker at a time
+        def upload_ticker(ticker, indicators_df):
+            upload_indicators(db_session, job, indicators_df, ticker, mode='replace' if replace else 'upsert')
+            save_backup(backup, indicators_df, ticker)
+            print(f"[DEBUG] Completed processing for {ticker}")
+        
+        print(f"\n[DEBUG] Streaming job {job.name} through the pipeline with {workers} workers")
+        stage_stats = run_pipeline(
+            stream_market_data(db_session, tickers=job.tickers, data_type=job.data_type),
+            upload_ticker,
+            features=job.features,
+            custom_params=job.custom_params,
+            workers=workers,
+            dtypes=job.dtypes if compact else None
+        )
+    for stage in stage_stats.values():
+        print(f"[DEBUG] {stage.summary()}")
+
+def run_jobs(db_session, jobs, workers=1, incremental=False, replace=False, stream=False, backup_dir='backups',
+             cache_dir=None, cache_size=2 * 1024 ** 3, compact=False, threads=False):
+    print("\n[DEBUG] Initializing market indicators calculator")
+    indicator_calculator = MarketIndicators()
+    # Results of unchanged tickers are reused across runs when a cache directory is given
+    cache = IndicatorCache(cache_dir, max_bytes=cache_size, calculator=indicator_calculator) if cache_dir else None
+    
+    for job in jobs:
+        print(f"[DEBUG] Job {job.name}: {len(job.tickers)} {job.data_type} tickers -> {job.table}")
+        print(f"[DEBUG] Features to calculate: {job.features}")
+        if job.unmapped_columns:
+            print(f"[DEBUG] Not uploaded, no column in {job.table}: {job.unmapped_columns}")
+    
+    if incremental:
+        for job in jobs:
+            run_incremental_update(db_session, indicator_calculator, job)
+        return
+    
+    if stream:
+        for job in jobs:
+            run_streaming_job(db_session, job, workers=workers, replace=replace, backup_dir=backup_dir, compact=compact)
+        return
+    
+    # One fetch of market data shared by every job
+    print("[DEBUG] Fetching market data")
+    market_data = fetch_market_data(
+        db_session,
+        tickers=sorted({ticker for job in jobs for ticker in job.tickers}),
+        data_type=sorted({job.data_type for job in jobs})
+    )
+    print(f"[DEBUG] Fetched {sum(len(df) for df in market_data.values())} records for {len(market_data)} tickers")
+    
+    for job in jobs:
+        # Compact mode keeps only the indicator columns, in the dtypes of the target table
+        dtypes = job.dtypes if compact else None
+        job_data = {}
+        for ticker in job.tickers:
+            if ticker not in market_data:
+                continue
+            df = market_data[ticker]
+            # A ticker listed under several data types only keeps this job's rows
+            if (df['Type'] != job.data_type).any():
+                df = df[df['Type'] == job.data_type]
+            if len(df):
+                job_data[ticker] = df
+        
+        if workers > 1 and threads:
+            # Calculate indicators per ticker across a pool of threads (compiled kernels release the GIL)
+            print(f"\n[DEBUG] Job {job.name}: calculating indicators for {len(job_data)} tickers with {workers} threads")
+            calculate = lambda data, features, custom_params: calculate_features_threaded(
+                data,
+                features=features,
+                custom_params=custom_params,
+                workers=workers,
+                dtypes=dtypes,
+                calculator=indicator_calculator
+            )
+        elif workers > 1:
+            # Calculate indicators per ticker across a pool of worker processes
+            print(f"\n[DEBUG] Job {job.name}: calculating indicators for {len(job_data)} tickers with {workers} workers")
+            calculate = lambda data, features, custom_params: calculate_features_parallel(
+                data,
+                features=features,
+                custom_params=custom_params,
+                workers=workers,
+                dtypes=dtypes
+            )
+        else:
+            # Calculate indicators for all tickers in one panel pass
+            print(f"\n[DEBUG] Job {job.name}: calculating indicators for {len(job_data)} tickers")
+            calculate = lambda data, features, custom_params: indicator_calculator.calculate_panel_features(
+                data,
+                features=features,
+                custom_params=custom_params,
+                dtypes=dtypes
+            )
+        
+        if cache is not None:
+            indicators_by_ticker = cache.calculate_panel_features(job_data, job.features, job.custom_params, calculate,
+                                                                  dtypes)
+            print(f"[DEBUG] Indicator cache: {cache.stats}")
+        else:
+            indicators_by_ticker = calculate(job_data, job.features, job.custom_params)
+        
+        # Upload indicators for each ticker to database, backing them up in the background
+        with open_backup(backup_dir, job) as backup:
+            for ticker, indicators_df in indicators_by_ticker.items():
+                print(f"\n[DEBUG] Processing ticker: {ticker}")
+                print(f"[DEBUG] Market data shape for {ticker}: {job_data[ticker].shape}")
+                
+                upload_indicators(db_session, job, indicators_df, ticker, mode='replace' if replace else 'upsert')
+                save_backup(backup, indicators_df, ticker)
+                print(f"[DEBUG] Completed processing for {ticker}")
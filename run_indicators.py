@@ -0,0 +1,74 @@
+from lib.db.session import create_db_session
+from lib.runner import load_jobs, run_jobs
+
+from dotenv import load_dotenv
+import argparse
+import os
+
+def main(config="jobs.toml", job_names=None, workers=1, incremental=False, replace=False, stream=False,
+         backup_dir="backups", cache_dir=None, cache_size_mb=2048, compact=False,
+         threads=False):
+    print("\n[DEBUG] Starting main function")
+    load_dotenv()
+    
+    print(f"[DEBUG] Loading jobs from {config}")
+    jobs = load_jobs(config)
+    if job_names:
+        unknown = set(job_names) - {job.name for job in jobs}
+        if unknown:
+            raise ValueError(f"Unknown jobs {sorted(unknown)} in {config}")
+        jobs = [job for job in jobs if job.name in job_names]
+    print(f"[DEBUG] Running jobs: {[job.name for job in jobs]}")
+
+    print("[DEBUG] Setting up database connection")
+    # Setup database connection
+    db_session = create_db_session(
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        database=os.getenv("DB_NAME")
+    )
+    
+    run_jobs(db_session, jobs, workers=workers, incremental=incremental, replace=replace, stream=stream,
+             backup_dir=backup_dir, cache_dir=cache_dir, cache_size=cache_size_mb * 1024 ** 2,
+             compact=compact, threads=threads)
+
+def build_parser(description="Calculate and upload indicators for the jobs in a TOML/YAML job spec"):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes for indicator calculation (default: 1)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only calculate and insert bars newer than the last stored ones")
+    parser.add_argument("--replace", action="store_true",
+                        help="Delete and reinsert each ticker's rows instead of upserting changed ones")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream market data and run fetch, calculation and upload as concurrent stages")
+    parser.add_argument("--backup-dir", default="backups",
+                        help="Directory for the per-job Parquet backups (default: backups)")
+    parser.add_argument("--no-backup", action="store_true",
+                        help="Skip writing Parquet backups")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Reuse indicators of tickers with unchanged market data from this directory")
+    parser.add_argument("--cache-size-mb", type=int, default=2048,
+                        help="Size bound of the indicator cache in MB, least recently used entries are evicted (default: 2048)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Keep only indicator columns, as float32 where the table stores Float(4)")
+    parser.add_argument("--threads", action="store_true",
+                        help="Use --workers threads instead of processes (best with numba installed)")
+    return parser
+
+if __name__ == "__main__":
+    parser = build_parser()
+    parser.add_argument("config", nargs="?", default="jobs.toml",
+                        help="Job spec file, .toml or .yaml (default: jobs.toml)")
+    parser.add_argument("--job", action="append", dest="jobs",
+                        help="Only run the named job (repeatable; default: all jobs)")
+    args = parser.parse_args()
+
+    print("[DEBUG] Script started")
+    main(config=args.config, job_names=args.jobs, workers=args.workers,
+         incremental=args.incremental, replace=args.replace, stream=args.stream,
+         backup_dir=None if args.no_backup else args.backup_dir,
+         cache_dir=args.cache_dir, cache_size_mb=args.cache_size_mb, compact=args.compact,
+         threads=args.threads)
+    print("[DEBUG] Script completed")